@@ -67,11 +67,16 @@ datas = [
 # Hidden imports for dynamic imports
 hiddenimports = [
     'uvicorn',
+    'uvicorn.protocols.http.httptools_impl',
+    'httptools',
+    'uvicorn.loops.uvloop',
+    'uvloop',
     'fastapi',
     'pydantic',
     'swisseph',
     'pytz',
     'bcrypt',
+    'orjson',
     'sqlite3',
     'json',
     'datetime',
@@ -635,7 +635,10 @@ class UniversalInstaller:
                 # Fallback - return known dependencies
                 return [
                     'fastapi>=0.116.1',
+                    'orjson>=3.10.0',
                     'uvicorn>=0.35.0',
+                    'uvloop>=0.19.0; sys_platform != "win32"',
+                    'httptools>=0.6.0',
                     'pydantic>=2.11.9',
                     'pyswisseph>=2.10.3.2',
                     'pytz>=2025.2',
@@ -1,25 +1,31 @@
-from fastapi import FastAPI, HTTPException, Request, Depends
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, Query
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from pydantic import BaseModel, Field, validator, model_validator
+from pydantic import BaseModel, Field, validator, field_validator, model_validator
 from enum import Enum
 import swisseph as swe
 import pytz
 import os
-import json
+import orjson
 import secrets
 from datetime import datetime, timedelta
-from typing import Dict, Union, Optional, List
+from typing import Any, Dict, Union, Optional, List
 import hashlib
+import base64
+from urllib.parse import urlparse
 import bcrypt
 import sqlite3
 from timezonefinder import TimezoneFinder
 import threading
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from functools import lru_cache
+from collections import Counter, OrderedDict
+from functools import lru_cache, partial
 
 # Database connection pool for performance optimization
 class DatabaseManager:
@@ -44,32 +50,157 @@ class DatabaseManager:
     def get_connection(self):
         """Get a database connection with automatic management"""
         if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(self.db_path)
+            # Room to keep every request-path statement prepared: the literal SQL strings
+            # (plus the v1 listing variants) exceed sqlite3's default cache of 128
+            self._local.connection = sqlite3.connect(self.db_path, cached_statements=256)
             # Enable performance optimizations
             self._local.connection.execute('PRAGMA journal_mode=WAL')
             self._local.connection.execute('PRAGMA synchronous=NORMAL')
-            self._local.connection.execute('PRAGMA cache_size=10000')
+            self._local.connection.execute('PRAGMA cache_size=-65536')  # 64 MB
             self._local.connection.execute('PRAGMA temp_store=MEMORY')
+            self._local.connection.execute('PRAGMA mmap_size=268435456')  # read hot pages via mmap
         
         try:
             yield self._local.connection
         except Exception as e:
             self._local.connection.rollback()
             raise e
+        finally:
+            # The connection outlives the block, so discard anything left uncommitted
+            # (what closing a per-call connection used to do) to avoid holding write locks
+            if self._local.connection.in_transaction:
+                self._local.connection.rollback()
 
 # Global database manager instance
 db_manager = DatabaseManager()
 
+class SessionStore:
+    """Admin sessions that expire a fixed number of seconds after login.
+    
+    Tokens are kept in login order, so expired sessions are always at the front
+    and are dropped lazily on access instead of scanning every session. At most
+    max_sessions are kept; beyond that the oldest login is dropped.
+    """
+    
+    def __init__(self, ttl: int, max_sessions: int = 1000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # token -> (expires_at, session_data)
+        self._lock = threading.RLock()
+    
+    def expire(self) -> int:
+        """Drop expired sessions and return how many were removed"""
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            while self._sessions:
+                token, (expires_at, _) = next(iter(self._sessions.items()))
+                if expires_at > now:
+                    break
+                del self._sessions[token]
+                removed += 1
+        return removed
+    
+    def __setitem__(self, token: str, session_data: dict):
+        with self._lock:
+            self._sessions.pop(token, None)
+            self._sessions[token] = (time.monotonic() + self.ttl, session_data)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+    
+    def __getitem__(self, token: str) -> dict:
+        with self._lock:
+            self.expire()
+            return self._sessions[token][1]
+    
+    def __contains__(self, token: str) -> bool:
+        with self._lock:
+            self.expire()
+            return token in self._sessions
+    
+    def __delitem__(self, token: str):
+        with self._lock:
+            del self._sessions[token]
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self.expire()
+            return len(self._sessions)
+    
+    def pop(self, token: str, default=None):
+        with self._lock:
+            entry = self._sessions.pop(token, None)
+            return entry[1] if entry else default
+    
+    def items(self):
+        with self._lock:
+            self.expire()
+            return [(token, data) for token, (_, data) in self._sessions.items()]
+    
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed number of seconds.
+    
+    Used to keep hot database lookups off the request path. None is a valid cached
+    value, so callers test for a miss against TTLCache.MISSING.
+    """
+    
+    MISSING = object()
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=MISSING) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else default
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib json module"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 app = FastAPI(
     title="Vedic Astrology Calculator", 
+    default_response_class=OrjsonResponse,
     description="Calculate planetary longitudes and Ascendant using Swiss Ephemeris",
     # Security: Hide server information
     redoc_url=None if os.getenv('ENVIRONMENT') == 'production' else '/redoc',
     docs_url=None if os.getenv('ENVIRONMENT') == 'production' else '/docs'
 )
 
-# Add GZip compression middleware for better performance
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Add GZip compression middleware for better performance. Level 5 keeps most of the
+# size win on repetitive JSON (diagnostic logs, analytics) for far less CPU than 9
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 @app.on_event("startup")
 async def startup_event():
@@ -91,15 +222,79 @@ async def startup_event():
     migrate_existing_data()
     add_database_indexes()
     print("Database initialization completed")
+    
+    # Bounded pool for blocking SQLite work called from async handlers
+    app.state.db_executor = ThreadPoolExecutor(
+        max_workers=int(os.getenv('DB_EXECUTOR_WORKERS', '4')),
+        thread_name_prefix='db'
+    )
+    
+    # Chart calculations run here so natal and transit overlap and the event loop stays free
+    app.state.chart_executor = ThreadPoolExecutor(
+        max_workers=int(os.getenv('CHART_EXECUTOR_WORKERS', '4')),
+        thread_name_prefix='chart'
+    )
+    
+    # Sweep expired admin sessions in the background instead of on request paths
+    app.state.session_cleanup_task = asyncio.create_task(session_cleanup_loop())
+    
+    # Write buffered rate limit counters in batches
+    app.state.usage_flush_task = asyncio.create_task(usage_flush_loop())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
+    if getattr(app.state, 'session_cleanup_task', None):
+        app.state.session_cleanup_task.cancel()
+    
+    if getattr(app.state, 'usage_flush_task', None):
+        app.state.usage_flush_task.cancel()
+    
+    # Persist any usage counted since the last flush
+    try:
+        flush_usage_counts()
+    except Exception as e:
+        print(f"Failed to flush usage counters on shutdown: {e}")
+    
+    if getattr(app.state, 'db_executor', None):
+        app.state.db_executor.shutdown(wait=False)
+    
+    if getattr(app.state, 'chart_executor', None):
+        app.state.chart_executor.shutdown(wait=False)
+    
     # Close database connections
     if hasattr(db_manager._local, 'connection') and db_manager._local.connection:
         db_manager._local.connection.close()
         print("Database connections closed")
 
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database helper on the DB executor so the event loop stays free"""
+    return await asyncio.get_running_loop().run_in_executor(
+        app.state.db_executor, partial(func, *args, **kwargs)
+    )
+
+async def session_cleanup_loop():
+    """Periodically drop expired admin sessions"""
+    interval = max(SESSION_TIMEOUT / 4, 1)
+    while True:
+        await asyncio.sleep(interval)
+        ACTIVE_SESSIONS.expire()
+
+async def usage_flush_loop():
+    """Periodically write buffered rate limit counters to the database"""
+    while True:
+        await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+        try:
+            await run_db(flush_usage_counts)
+        except Exception as e:
+            print(f"Failed to flush usage counters: {e}")
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Return a JSON 500 for errors endpoints let propagate"""
+    print(f"Unhandled error on {request.url.path}: {exc}")
+    return OrjsonResponse(status_code=500, content={"detail": "Internal server error"})
+
 # Logging filter middleware to reduce health check spam
 @app.middleware("http") 
 async def logging_filter_middleware(request: Request, call_next):
@@ -120,39 +315,61 @@ async def logging_filter_middleware(request: Request, call_next):
     else:
         return await call_next(request)
 
-# Security headers and performance caching middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    
-    # Security headers to prevent common attacks
-    response.headers["X-Content-Type-Options"] = "nosniff"
+# Security headers and performance caching middleware.
+# Header values are fixed for the life of the process, so they are encoded once here
+# and appended to the raw ASGI headers instead of being set one by one per response.
+SECURITY_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
     # Allow embedding in Replit environment, but deny otherwise
-    if os.getenv('REPLIT_DEV_DOMAIN'):
-        response.headers["X-Frame-Options"] = "SAMEORIGIN"
-    else:
-        response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"
-    
-    # Performance: Add caching headers for static assets
-    if request.url.path.startswith('/static/'):
-        # Cache static files for 1 hour - let StaticFiles handle ETags naturally
-        response.headers["Cache-Control"] = "public, max-age=3600"
-    elif request.url.path == '/chart' and request.method == 'GET':
-        # Cache GET chart responses for 5 minutes to reduce computation
-        response.headers["Cache-Control"] = "public, max-age=300"
-    else:
-        # Default: no cache for dynamic content
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    
-    # Remove server header for security
-    if "server" in response.headers:
-        del response.headers["server"]
-    
-    return response
+    (b"x-frame-options", b"SAMEORIGIN" if os.getenv('REPLIT_DEV_DOMAIN') else b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"content-security-policy", b"default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'"),
+)
+# Replaced if a response already set them; server is removed for security
+SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS) | {b"server"}
+
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware adding security and cache headers to every HTTP response"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Performance: Add caching headers for static assets
+        path = scope["path"]
+        if path.startswith('/static/'):
+            # Cache static files for 1 hour - let StaticFiles handle ETags naturally
+            cache_control = b"public, max-age=3600"
+        elif path == '/chart' and scope["method"] == 'GET':
+            # Cache GET chart responses for 5 minutes to reduce computation
+            cache_control = b"public, max-age=300"
+        else:
+            cache_control = None
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    (name, value) for name, value in message.get("headers", ())
+                    if name not in SECURITY_HEADER_NAMES and not (cache_control and name == b"cache-control")
+                ]
+                headers.extend(SECURITY_HEADERS)
+                if cache_control:
+                    headers.append((b"cache-control", cache_control))
+                elif not any(name == b"cache-control" for name, _ in headers):
+                    # Default: no cache for dynamic content unless the endpoint set its own policy
+                    headers.append((b"cache-control", b"no-cache, no-store, must-revalidate"))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+app.add_middleware(SecurityHeadersMiddleware)
 
 # CORS configuration - restrictive by default
 # Include Replit preview domain in CORS origins
@@ -223,6 +440,14 @@ AYANAMSHA_OPTIONS = {
     'valens_moon': {'id': swe.SIDM_VALENS_MOON, 'name': 'Valens (Moon)'}
 }
 
+# Static endpoint bodies are serialized once at import instead of on every request
+AYANAMSHA_OPTIONS_BODY = orjson.dumps({"options": AYANAMSHA_OPTIONS})
+HEALTH_BODY = orjson.dumps({"status": "healthy", "ephe_path": ephe_path})
+API_STATUS_BODY = orjson.dumps({"status": "ok", "api": "vedic-astrology-calculator", "version": "1.0"})
+
+# The options never change at runtime, so a content hash works as a stable ETag
+AYANAMSHA_OPTIONS_ETAG = '"' + hashlib.sha256(AYANAMSHA_OPTIONS_BODY).hexdigest()[:16] + '"'
+
 # Default to J.N. Bhasin
 swe.set_sid_mode(swe.SIDM_JN_BHASIN)
 
@@ -238,6 +463,14 @@ PLANETS = {
     'Rahu': swe.MEAN_NODE,  # Mean North Node
 }
 
+# (name, Swiss Ephemeris id) pairs frozen for the per-planet calculation loop
+PLANET_IDS = tuple(PLANETS.items())
+
+# Chart output order: the calculated planets followed by Ketu (derived from Rahu)
+CHART_PLANET_NAMES = tuple(PLANETS) + ('Ketu',)
+RAHU_INDEX = CHART_PLANET_NAMES.index('Rahu')
+HOUSE_CUSP_KEYS = tuple(f"House {i + 1}" for i in range(12))
+
 # House system options for Swiss Ephemeris
 HOUSE_SYSTEMS = {
     'placidus': 'P',        # Placidus
@@ -253,6 +486,13 @@ HOUSE_SYSTEM_NAMES = {
     'sripati': 'Sripati'
 }
 
+# Lookup tables for the chart hot path, derived once from the option dicts above
+HOUSE_SYSTEM_CODES = {key: code.encode('ascii') for key, code in HOUSE_SYSTEMS.items()}
+AYANAMSHA_IDS = {key: option['id'] for key, option in AYANAMSHA_OPTIONS.items()}
+AYANAMSHA_NAMES = {key: option['name'] for key, option in AYANAMSHA_OPTIONS.items()}
+INVALID_AYANAMSHA_DETAIL = f"Invalid ayanamsha. Must be one of: {list(AYANAMSHA_OPTIONS.keys())}"
+INVALID_HOUSE_SYSTEM_DETAIL = f"Invalid house system. Must be one of: {list(HOUSE_SYSTEMS.keys())}"
+
 # Admin authentication is now handled entirely through the database
 # No environment variables are used for admin credentials for security
 
@@ -265,7 +505,16 @@ default_domains_list = ['localhost', '127.0.0.1']
 default_domains = os.getenv('AUTHORIZED_DOMAINS', ','.join(default_domains_list))
 AUTHORIZED_DOMAINS = set(domain.strip() for domain in default_domains.split(',') if domain.strip())
 API_KEYS = {}
-ACTIVE_SESSIONS = {}  # Now stores {token: {username: str, created_at: datetime}}
+MAX_ACTIVE_SESSIONS = int(os.getenv('MAX_ACTIVE_SESSIONS', '1000'))
+ACTIVE_SESSIONS = SessionStore(SESSION_TIMEOUT, MAX_ACTIVE_SESSIONS)  # {token: {username: str, created_at: monotonic float, ...}}
+
+# Short-lived caches for the admin, API key and domain lookups made on every request.
+# Writes in this process invalidate them immediately; with several workers another
+# process can serve a stale entry for at most AUTH_CACHE_TTL seconds.
+AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', '30'))
+ADMIN_CACHE = TTLCache(maxsize=128, ttl=60)  # {username: admin dict or None}
+API_KEY_CACHE = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)  # {key_hash: limits dict or None}
+DOMAIN_CACHE = TTLCache(maxsize=1, ttl=AUTH_CACHE_TTL)  # {'active': frozenset of domain names}
 
 # Initialize TimezoneFinder for automatic timezone detection
 tf = TimezoneFinder()
@@ -274,19 +523,19 @@ tf = TimezoneFinder()
 class ChartRequest(BaseModel):
     # Original numeric fields (for backward compatibility)
     year: Optional[int] = None
-    month: Optional[int] = None
-    day: Optional[int] = None
-    hour: Optional[int] = None
-    minute: int = 0
-    second: int = 0
+    month: Optional[int] = Field(None, ge=1, le=12)
+    day: Optional[int] = Field(None, ge=1, le=31)
+    hour: Optional[int] = Field(None, ge=0, le=23)
+    minute: int = Field(0, ge=0, le=59)
+    second: int = Field(0, ge=0, le=59)
     
     # New combined date/time fields
     date: Optional[str] = None  # DD/MM/YYYY format
     time: Optional[str] = None  # HH:MM:SS format
     
     # Location and timezone
-    lat: float
-    lon: float
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
     tz: Optional[str] = None  # Made optional - will auto-detect from coordinates if not provided
     
     # Ayanamsha and house system fields with fallback support
@@ -367,7 +616,8 @@ class ChartRequest(BaseModel):
             
         return values
     
-    @validator('ayanamsha')
+    @field_validator('ayanamsha')
+    @classmethod
     def validate_ayanamsha_with_fallback(cls, v):
         """Validate ayanamsha with automatic fallback"""
         if v not in AYANAMSHA_OPTIONS:
@@ -375,7 +625,8 @@ class ChartRequest(BaseModel):
             return 'jn_bhasin'
         return v
     
-    @validator('house_system')
+    @field_validator('house_system')
+    @classmethod
     def validate_house_system_with_fallback(cls, v):
         """Validate house system with automatic fallback"""
         if v not in HOUSE_SYSTEMS:
@@ -444,6 +695,13 @@ class SortOrder(str, Enum):
     asc = "asc"
     desc = "desc"
 
+# Every ORDER BY the v1 listings can use, built once from the enums above so the
+# request path only looks one up; the SQL text, and so sqlite3's cached statement, is reused
+ORDER_BY_CLAUSES = {
+    (field, order): f'ORDER BY {field.value} {order.value.upper()}'
+    for field in (*APIKeySortField, *DomainSortField) for order in SortOrder
+}
+
 class BulkOperationType(str, Enum):
     delete = "delete"
     activate = "activate"
@@ -464,20 +722,6 @@ class BulkUpdateLimitsPayload(BaseModel):
         return v
 
 # V1 Admin API Models - Enhanced for scalability
-class APIKeyPaginationParams(BaseModel):
-    page: int = Field(1, ge=1, le=10000)
-    page_size: int = Field(25, ge=1, le=1000)
-    search: Optional[str] = Field("", max_length=255)
-    sort_by: APIKeySortField = APIKeySortField.created_at
-    sort_order: SortOrder = SortOrder.desc
-
-class DomainPaginationParams(BaseModel):
-    page: int = Field(1, ge=1, le=10000)
-    page_size: int = Field(25, ge=1, le=1000)
-    search: Optional[str] = Field("", max_length=255)
-    sort_by: DomainSortField = DomainSortField.created_at
-    sort_order: SortOrder = SortOrder.desc
-
 class APIKeyFilters(BaseModel):
     is_active: Optional[bool] = None
     created_after: Optional[datetime] = None
@@ -596,6 +840,9 @@ class DiagnosticLogEntry(BaseModel):
     rl_day_limit: Optional[int]
     rl_month_limit: Optional[int]
 
+# Column order of the diagnostic logs SELECT, matching DiagnosticLogEntry fields
+DIAGNOSTIC_LOG_FIELDS = tuple(DiagnosticLogEntry.model_fields)
+
 class DiagnosticStatusResponse(BaseModel):
     api_key_enforcement_enabled: bool
     bypass_enabled: bool
@@ -612,8 +859,11 @@ class DiagnosticLogsResponse(BaseModel):
 
 
 # Utility functions
+@lru_cache(maxsize=4096)
 def decimal_to_dms(decimal_degrees):
     """Convert decimal degrees to degrees, minutes, seconds format"""
+    # Cached on the exact value: the ayanamsha for a repeated chart instant is the
+    # same float every time, and exact keys keep the formatted output unchanged
     degrees = int(decimal_degrees)
     minutes_float = (decimal_degrees - degrees) * 60
     minutes = int(minutes_float)
@@ -633,22 +883,34 @@ def get_timezone_from_coordinates(lat: float, lon: float) -> str:
         print(f"Error detecting timezone from coordinates ({lat}, {lon}): {e}")
         return 'UTC'
 
+@lru_cache(maxsize=512)
+def get_timezone(timezone_str: str):
+    """Cached pytz timezone lookup; unknown names raise and are not cached"""
+    return pytz.timezone(timezone_str)
+
 def convert_timezone_to_ut(year, month, day, hour, minute, second, timezone_str):
     """Convert local time to Universal Time"""
     try:
         if timezone_str == 'UTC':
             return hour + minute/60 + second/3600
         
-        tz = pytz.timezone(timezone_str)
+        # Shift by the zone's UTC offset for that local time; localize() defaults to is_dst=False,
+        # so times in a DST gap or overlap resolve to standard time instead of raising
         local_dt = datetime(year, month, day, int(hour), int(minute), int(second))
-        local_dt = tz.localize(local_dt)
-        utc_dt = local_dt.astimezone(pytz.utc)
+        utc_offset = get_timezone(timezone_str).localize(local_dt).utcoffset() or timedelta(0)
+        offset = int(utc_offset.total_seconds())
+        ut_seconds = (local_dt.hour * 3600 + local_dt.minute * 60 + local_dt.second - offset) % 86400
+        ut_hour, ut_rest = divmod(ut_seconds, 3600)
+        ut_minute, ut_second = divmod(ut_rest, 60)
         
-        return utc_dt.hour + utc_dt.minute/60 + utc_dt.second/3600
+        return ut_hour + ut_minute/60 + ut_second/3600
     except:
         # If timezone conversion fails, assume UTC
         return hour + minute/60 + second/3600
 
+MONTH_NAMES = ('', 'January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December')
+
 def convert_julian_to_date(julian_day_ut, timezone_str='UTC'):
     """Convert Julian Day to readable date format like '21 July 1986 time: 17:45:23'"""
     try:
@@ -666,7 +928,7 @@ def convert_julian_to_date(julian_day_ut, timezone_str='UTC'):
         # Convert to user's timezone if not UTC
         if timezone_str != 'UTC':
             try:
-                tz = pytz.timezone(timezone_str)
+                tz = get_timezone(timezone_str)
                 utc_dt = pytz.utc.localize(utc_dt)
                 local_dt = utc_dt.astimezone(tz)
             except:
@@ -675,10 +937,7 @@ def convert_julian_to_date(julian_day_ut, timezone_str='UTC'):
             local_dt = utc_dt
         
         # Format as "21 July 1986 time: 17:45:23"
-        month_names = ['', 'January', 'February', 'March', 'April', 'May', 'June',
-                      'July', 'August', 'September', 'October', 'November', 'December']
-        
-        formatted_date = f"{local_dt.day} {month_names[local_dt.month]} {local_dt.year} time: {local_dt.hour:02d}:{local_dt.minute:02d}:{local_dt.second:02d}"
+        formatted_date = f"{local_dt.day} {MONTH_NAMES[local_dt.month]} {local_dt.year} time: {local_dt.hour:02d}:{local_dt.minute:02d}:{local_dt.second:02d}"
         
         return formatted_date
         
@@ -695,6 +954,14 @@ def init_database():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    # WAL is stored in the database file, so every later connection gets concurrent
+    # readers alongside the usage-counter writer. Must be set outside a transaction.
+    cursor.execute('PRAGMA journal_mode=WAL')
+    
+    # sqlite3 autocommits DDL, so without an explicit transaction every CREATE below
+    # would be its own commit and journal sync; run the whole schema setup as one
+    cursor.execute('BEGIN IMMEDIATE')
+    
     # Create admins table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS admins (
@@ -774,6 +1041,27 @@ def init_database():
         )
     ''')
     
+    # Hourly rollup of usage_minute for the analytics hourly chart (hour_key is YYYY-MM-DD-HH)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_hour (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            identifier TEXT NOT NULL,
+            identifier_type TEXT NOT NULL CHECK(identifier_type IN ('api_key', 'domain')),
+            hour_key TEXT NOT NULL,
+            count INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(identifier, identifier_type, hour_key)
+        )
+    ''')
+    # Seed a new usage_hour from the minute buckets already recorded
+    cursor.execute('''
+        INSERT INTO usage_hour (identifier, identifier_type, hour_key, count)
+        SELECT identifier, identifier_type, SUBSTR(minute_key, 1, 13), SUM(count)
+        FROM usage_minute
+        WHERE NOT EXISTS (SELECT 1 FROM usage_hour)
+        GROUP BY identifier, identifier_type, SUBSTR(minute_key, 1, 13)
+    ''')
+    
     # Create app_settings table for system configuration
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS app_settings (
@@ -810,18 +1098,73 @@ def init_database():
         )
     ''')
     
-    # Create indexes for performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_minute_identifier ON usage_minute(identifier, minute_key)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_identifier ON usage_day(identifier, day_key)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_month_identifier ON usage_month(identifier, month_key)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_hash ON api_keys(key_hash)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_domain ON authorized_domains(domain)')
+    # Running row count for api_diagnostics, kept by triggers so the unfiltered
+    # logs page does not have to COUNT(*) a table that grows on every request
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_diagnostics_count (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO api_diagnostics_count (id, total) SELECT 1, COUNT(*) FROM api_diagnostics')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_api_diagnostics_count_insert
+        AFTER INSERT ON api_diagnostics
+        BEGIN
+            UPDATE api_diagnostics_count SET total = total + 1 WHERE id = 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_api_diagnostics_count_delete
+        AFTER DELETE ON api_diagnostics
+        BEGIN
+            UPDATE api_diagnostics_count SET total = total - 1 WHERE id = 1;
+        END
+    ''')
+    
+    # Trigram full-text index over API key names and descriptions, kept in sync by
+    # triggers, so substring search does not scan the whole table
+    global API_KEYS_FTS_ENABLED
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'api_keys_fts'")
+        fts_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS api_keys_fts USING fts5(
+                name, description, content='api_keys', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_api_keys_fts_insert
+            AFTER INSERT ON api_keys
+            BEGIN
+                INSERT INTO api_keys_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_api_keys_fts_delete
+            AFTER DELETE ON api_keys
+            BEGIN
+                INSERT INTO api_keys_fts (api_keys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_api_keys_fts_update
+            AFTER UPDATE OF name, description ON api_keys
+            BEGIN
+                INSERT INTO api_keys_fts (api_keys_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO api_keys_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        ''')
+        if not fts_exists:
+            # Index the keys that existed before the full-text table
+            cursor.execute("INSERT INTO api_keys_fts (api_keys_fts) VALUES ('rebuild')")
+        API_KEYS_FTS_ENABLED = True
+    except sqlite3.OperationalError as e:
+        # SQLite without FTS5 or the trigram tokenizer (3.34+): search falls back to LIKE
+        print(f"API key full-text search unavailable, using LIKE: {e}")
     
-    # Indexes for new diagnostic tables
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_ts ON api_diagnostics(ts)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_outcome ON api_diagnostics(outcome)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_client_ip ON api_diagnostics(client_ip)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_path ON api_diagnostics(path)')
+    # Lookups by key_hash, domain and usage bucket are served by the UNIQUE constraints;
+    # the remaining indexes are managed in add_database_indexes
     
     # Initialize default app settings
     default_settings = [
@@ -846,36 +1189,47 @@ def add_database_indexes():
     cursor = conn.cursor()
     
     try:
+        # One transaction for the whole batch instead of a commit per DDL statement
+        cursor.execute('BEGIN IMMEDIATE')
+        
         # First, remove redundant indexes to optimize performance
         cursor.execute('DROP INDEX IF EXISTS idx_usage_minute_identifier')
         cursor.execute('DROP INDEX IF EXISTS idx_usage_day_identifier') 
         cursor.execute('DROP INDEX IF EXISTS idx_usage_month_identifier')
+        cursor.execute('DROP INDEX IF EXISTS idx_api_diagnostics_outcome')
+        cursor.execute('DROP INDEX IF EXISTS idx_api_diagnostics_client_ip')
+        
+        # Duplicates of the UNIQUE constraints on key_hash and domain
+        cursor.execute('DROP INDEX IF EXISTS idx_api_keys_hash')
+        cursor.execute('DROP INDEX IF EXISTS idx_domains_domain')
         
-        # Additional indexes for improved v1 admin query performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_is_active ON api_keys(is_active)')
+        # Only ever used for sorting the small admin listings, which SQLite sorts in memory
+        # cheaply; each one was another b-tree to update on every key or domain write.
+        # is_active alone is covered by the (is_active, created_at) composites below.
+        for table_prefix in ('api_keys', 'domains'):
+            for column in ('is_active', 'updated_at', 'per_minute_limit', 'per_day_limit', 'per_month_limit'):
+                cursor.execute(f'DROP INDEX IF EXISTS idx_{table_prefix}_{column}')
+        
+        # Indexes for the default admin listing order and the analytics dropdown
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_created_at ON api_keys(created_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_updated_at ON api_keys(updated_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_name ON api_keys(name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_per_minute_limit ON api_keys(per_minute_limit)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_per_day_limit ON api_keys(per_day_limit)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_per_month_limit ON api_keys(per_month_limit)')
-        
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_is_active ON authorized_domains(is_active)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_created_at ON authorized_domains(created_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_updated_at ON authorized_domains(updated_at)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_per_minute_limit ON authorized_domains(per_minute_limit)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_per_day_limit ON authorized_domains(per_day_limit)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_per_month_limit ON authorized_domains(per_month_limit)')
         
         # Composite indexes for common filter combinations
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_keys_active_created ON api_keys(is_active, created_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_domains_active_created ON authorized_domains(is_active, created_at)')
         
-        # Usage tracking table indexes for optimal rate limiting performance (these cover the redundant ones)
+        # Usage tracking table indexes for rate limiting; check_and_increment_usage matches all three
+        # columns, so its count lookups are exact-key searches whatever unique constraint the table has
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_minute_lookup ON usage_minute(identifier, identifier_type, minute_key)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_lookup ON usage_day(identifier, identifier_type, day_key)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_month_lookup ON usage_month(identifier, identifier_type, month_key)')
         
+        # Covering index for the analytics and summary queries, which filter usage_day by
+        # day_key (range) and group by day_key, identifier_type: answered from the index alone
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_cover ON usage_day(day_key, identifier_type, identifier, count)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_hour_cover ON usage_hour(hour_key, identifier_type, identifier, count)')
+        
         # Indexes for cleanup/archiving queries (created_at for old data removal)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_minute_created_at ON usage_minute(created_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_created_at ON usage_day(created_at)')
@@ -886,7 +1240,15 @@ def add_database_indexes():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_path ON api_diagnostics(path)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_request_id ON api_diagnostics(request_id)')
         
+        # Diagnostic log filters sorted by newest first (these cover the redundant ones)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_outcome_ts ON api_diagnostics(outcome, ts)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_diagnostics_client_ip_ts ON api_diagnostics(client_ip, ts)')
+        
         conn.commit()
+        
+        # Refresh planner statistics where they are missing or stale so the indexes above get
+        # picked; cheap when nothing has changed
+        cursor.execute('PRAGMA optimize')
         conn.close()
         print("Database performance indexes optimized successfully")
         return True
@@ -991,90 +1353,135 @@ def validate_security_config():
 
 def get_admin_by_username(username: str):
     """Get admin user by username"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM admins WHERE username = ?', (username,))
-    result = cursor.fetchone()
-    conn.close()
-    if result:
-        return {
-            'id': result[0],
-            'username': result[1], 
-            'password_hash': result[2],
-            'must_change_password': bool(result[3]) if len(result) > 3 else False,
-            'created_at': result[4] if len(result) > 4 else result[3],
-            'updated_at': result[5] if len(result) > 5 else result[4] if len(result) > 4 else result[3]
-        }
-    return None
+    admin = ADMIN_CACHE.get(username)
+    if admin is not TTLCache.MISSING:
+        return admin
+    
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM admins WHERE username = ?', (username,))
+        result = cursor.fetchone()
+        admin = None
+        if result:
+            admin = {
+                'id': result[0],
+                'username': result[1], 
+                'password_hash': result[2],
+                'must_change_password': bool(result[3]) if len(result) > 3 else False,
+                'created_at': result[4] if len(result) > 4 else result[3],
+                'updated_at': result[5] if len(result) > 5 else result[4] if len(result) > 4 else result[3]
+            }
+        ADMIN_CACHE[username] = admin
+        return admin
 
 def update_admin_password(username: str, new_password_hash: str, clear_change_requirement: bool = True):
     """Update admin password and optionally clear password change requirement"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    if clear_change_requirement:
-        cursor.execute(
-            'UPDATE admins SET password_hash = ?, must_change_password = FALSE, updated_at = CURRENT_TIMESTAMP WHERE username = ?',
-            (new_password_hash, username)
-        )
-    else:
-        cursor.execute(
-            'UPDATE admins SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE username = ?',
-            (new_password_hash, username)
-        )
-    
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    return success
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        if clear_change_requirement:
+            cursor.execute(
+                'UPDATE admins SET password_hash = ?, must_change_password = FALSE, updated_at = CURRENT_TIMESTAMP WHERE username = ?',
+                (new_password_hash, username)
+            )
+        else:
+            cursor.execute(
+                'UPDATE admins SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE username = ?',
+                (new_password_hash, username)
+            )
+        
+        conn.commit()
+        ADMIN_CACHE.pop(username)
+        success = cursor.rowcount > 0
+        return success
 
-def get_api_keys_paginated(page: int = 1, page_size: int = 20, search: str = ''):
-    """Get API keys with pagination and search"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    offset = (page - 1) * page_size
+# Set by init_database once the api_keys_fts trigram index is in place
+API_KEYS_FTS_ENABLED = False
+
+def api_key_search_condition(search: str):
+    """WHERE condition and params matching API keys whose name or description is LIKE %search%"""
     search_pattern = f'%{search}%'
+    condition, params = '(name LIKE ? OR description LIKE ?)', [search_pattern, search_pattern]
+    
+    # The trigram index needs at least one full trigram and cannot express LIKE wildcards
+    if API_KEYS_FTS_ENABLED and len(search) >= 3 and '%' not in search and '_' not in search:
+        # The phrase match (quoted so FTS5 syntax in the search is literal) narrows the rows
+        # through the index; it also folds non-ASCII case, so LIKE re-checks the few candidates
+        phrase = '"' + search.replace('"', '""') + '"'
+        return f'id IN (SELECT rowid FROM api_keys_fts WHERE api_keys_fts MATCH ?) AND {condition}', [phrase, *params]
+    return condition, params
+
+def encode_page_cursor(created_at: str, row_id: int) -> str:
+    """Opaque cursor for the row after which the next page starts"""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at, row_id])).decode('ascii')
+
+def decode_page_cursor(cursor: str):
+    """Decode a cursor from encode_page_cursor into (created_at, id)"""
+    try:
+        created_at, row_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if isinstance(created_at, str) and isinstance(row_id, int):
+            return created_at, row_id
+    except Exception:
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def get_api_keys_paginated(page: int = 1, page_size: int = 20, search: str = '', after=None):
+    """Get API keys with pagination and search.
     
-    # Get total count
-    cursor.execute(
-        'SELECT COUNT(*) FROM api_keys WHERE name LIKE ? OR description LIKE ?',
-        (search_pattern, search_pattern)
-    )
-    total = cursor.fetchone()[0]
-    
-    # Get paginated results
-    cursor.execute('''
-        SELECT key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit, 
-               is_active, created_at, updated_at
-        FROM api_keys 
-        WHERE name LIKE ? OR description LIKE ?
-        ORDER BY created_at DESC 
-        LIMIT ? OFFSET ?
-    ''', (search_pattern, search_pattern, page_size, offset))
-    
-    keys = []
-    for row in cursor.fetchall():
-        keys.append({
-            'key_hash': row[0],
-            'name': row[1],
-            'description': row[2],
-            'per_minute_limit': row[3],
-            'per_day_limit': row[4],
-            'per_month_limit': row[5],
-            'is_active': bool(row[6]),
-            'created_at': row[7],
-            'updated_at': row[8]
-        })
-    
-    conn.close()
-    return {
-        'keys': keys,
-        'total': total,
-        'page': page,
-        'page_size': page_size,
-        'total_pages': (total + page_size - 1) // page_size
-    }
+    With after=(created_at, id) from a previous page's next_cursor, the page starts right
+    after that row through the created_at index instead of skipping OFFSET rows.
+    """
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        where_conditions, params = [], []
+        if search:
+            condition, params = api_key_search_condition(search)
+            where_conditions.append(condition)
+        
+        # Get total count
+        where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
+        cursor.execute(f'SELECT COUNT(*) FROM api_keys {where_clause}', params)
+        total = cursor.fetchone()[0]
+        
+        if after:
+            where_conditions.append('(created_at, id) < (?, ?)')
+            params = [*params, *after]
+            offset = 0
+        else:
+            offset = (page - 1) * page_size
+        
+        # Get paginated results, newest first with id breaking created_at ties
+        where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
+        cursor.execute(f'''
+            SELECT key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit, 
+                   is_active, created_at, updated_at, id
+            FROM api_keys 
+            {where_clause}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ? OFFSET ?
+        ''', (*params, page_size, offset))
+        rows = cursor.fetchall()
+        
+        keys = [
+            {
+                'key_hash': key_hash, 'name': name, 'description': description,
+                'per_minute_limit': per_minute_limit, 'per_day_limit': per_day_limit,
+                'per_month_limit': per_month_limit, 'is_active': bool(is_active),
+                'created_at': created_at, 'updated_at': updated_at
+            }
+            for (key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit,
+                 is_active, created_at, updated_at, _id) in rows
+        ]
+        
+        return {
+            'keys': keys,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': (total + page_size - 1) // page_size,
+            'next_cursor': encode_page_cursor(rows[-1][7], rows[-1][9]) if len(rows) == page_size else None
+        }
 
 def create_api_key_db(name: str, description: str = '', per_minute_limit: int = 60, 
                      per_day_limit: int = 1000, per_month_limit: int = 30000):
@@ -1082,92 +1489,137 @@ def create_api_key_db(name: str, description: str = '', per_minute_limit: int =
     api_key = secrets.token_urlsafe(32)
     key_hash = hashlib.sha256(api_key.encode()).hexdigest()
     
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute('''
-            INSERT INTO api_keys (key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit))
-        conn.commit()
-        conn.close()
-        return {'api_key': api_key, 'key_hash': key_hash}
-    except sqlite3.IntegrityError:
-        conn.close()
-        return None
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO api_keys (key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit))
+            conn.commit()
+            API_KEY_CACHE.pop(key_hash)
+            return {'api_key': api_key, 'key_hash': key_hash}
+        except sqlite3.IntegrityError:
+            return None
 
 def update_api_key_limits(key_hash: str, per_minute_limit: int, per_day_limit: int, per_month_limit: int):
     """Update API key limits"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE api_keys 
-        SET per_minute_limit = ?, per_day_limit = ?, per_month_limit = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE key_hash = ?
-    ''', (per_minute_limit, per_day_limit, per_month_limit, key_hash))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    return success
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE api_keys 
+            SET per_minute_limit = ?, per_day_limit = ?, per_month_limit = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE key_hash = ?
+        ''', (per_minute_limit, per_day_limit, per_month_limit, key_hash))
+        conn.commit()
+        API_KEY_CACHE.pop(key_hash)
+        success = cursor.rowcount > 0
+        return success
 
 def delete_api_key_db(key_hash: str):
     """Delete API key from database"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM api_keys WHERE key_hash = ?', (key_hash,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    return success
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM api_keys WHERE key_hash = ?', (key_hash,))
+        conn.commit()
+        API_KEY_CACHE.pop(key_hash)
+        success = cursor.rowcount > 0
+        return success
 
 def get_authorized_domains():
     """Get all authorized domains"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM authorized_domains WHERE is_active = TRUE ORDER BY created_at DESC')
-    domains = []
-    for row in cursor.fetchall():
-        domains.append({
-            'id': row[0],
-            'domain': row[1],
-            'per_minute_limit': row[2],
-            'per_day_limit': row[3], 
-            'per_month_limit': row[4],
-            'is_active': bool(row[5]),
-            'created_at': row[6],
-            'updated_at': row[7]
-        })
-    conn.close()
-    return domains
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute('''
+            SELECT id, domain, per_minute_limit, per_day_limit, per_month_limit, is_active, created_at, updated_at
+            FROM authorized_domains WHERE is_active = TRUE ORDER BY created_at DESC
+        ''')
+        return [{**row, 'is_active': bool(row['is_active'])} for row in cursor.fetchall()]
+
+def get_authorized_domains_paginated(page: int = 1, page_size: int = 100, after=None):
+    """Get one page of active authorized domains, newest first (after works as in get_api_keys_paginated)"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        cursor.execute('SELECT COUNT(*) FROM authorized_domains WHERE is_active = TRUE')
+        total = cursor.fetchone()[0]
+        
+        where_clause, params = 'WHERE is_active = TRUE', []
+        if after:
+            where_clause += ' AND (created_at, id) < (?, ?)'
+            params = list(after)
+            offset = 0
+        else:
+            offset = (page - 1) * page_size
+        
+        cursor.execute(f'''
+            SELECT id, domain, per_minute_limit, per_day_limit, per_month_limit, is_active, created_at, updated_at
+            FROM authorized_domains
+            {where_clause}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ? OFFSET ?
+        ''', (*params, page_size, offset))
+        rows = cursor.fetchall()
+        
+        domains = [{**row, 'is_active': bool(row['is_active'])} for row in rows]
+        
+        return {
+            'domains': domains,
+            'total': total,
+            'next_cursor': encode_page_cursor(rows[-1]['created_at'], rows[-1]['id']) if len(rows) == page_size else None
+        }
 
 def add_authorized_domain(domain: str, per_minute_limit: int = 10, per_day_limit: int = 100, per_month_limit: int = 3000):
     """Add authorized domain"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    try:
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT INTO authorized_domains (domain, per_minute_limit, per_day_limit, per_month_limit)
+                VALUES (?, ?, ?, ?)
+            ''', (domain, per_minute_limit, per_day_limit, per_month_limit))
+            conn.commit()
+            DOMAIN_CACHE.clear()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+def update_domain_limits(domain: str, per_minute_limit: int, per_day_limit: int, per_month_limit: int):
+    """Update authorized domain limits"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO authorized_domains (domain, per_minute_limit, per_day_limit, per_month_limit)
-            VALUES (?, ?, ?, ?)
-        ''', (domain, per_minute_limit, per_day_limit, per_month_limit))
+            UPDATE authorized_domains 
+            SET per_minute_limit = ?, per_day_limit = ?, per_month_limit = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE domain = ?
+        ''', (per_minute_limit, per_day_limit, per_month_limit, domain))
         conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
+        success = cursor.rowcount > 0
+        return success
 
 def delete_authorized_domain(domain: str):
     """Delete authorized domain"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM authorized_domains WHERE domain = ?', (domain,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    return success
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM authorized_domains WHERE domain = ?', (domain,))
+        conn.commit()
+        DOMAIN_CACHE.clear()
+        success = cursor.rowcount > 0
+        return success
 
 # Rate limiting functions
+# Rate limit increments waiting to be written, batched so requests do not each pay
+# for a write transaction: {(table, identifier, identifier_type, bucket_key): count}
+PENDING_USAGE = Counter()
+USAGE_LOCK = threading.Lock()
+USAGE_FLUSH_INTERVAL = float(os.getenv('USAGE_FLUSH_INTERVAL', '2'))
+USAGE_BUCKET_COLUMNS = {
+    'usage_minute': 'minute_key', 'usage_hour': 'hour_key', 'usage_day': 'day_key', 'usage_month': 'month_key'
+}
+
 def get_time_keys():
     """Get current minute, day, and month keys for rate limiting"""
     now = datetime.now()
@@ -1178,78 +1630,95 @@ def get_time_keys():
 
 def check_and_increment_usage(identifier: str, identifier_type: str, per_minute_limit: int, per_day_limit: int, per_month_limit: int):
     """Check rate limits and increment usage counters atomically"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    minute_key, day_key, month_key = get_time_keys()
-    now = datetime.now()
-    
-    try:
-        # Check current usage
-        cursor.execute('SELECT count FROM usage_minute WHERE identifier = ? AND minute_key = ?', (identifier, minute_key))
-        minute_count = cursor.fetchone()
-        minute_count = minute_count[0] if minute_count else 0
-        
-        cursor.execute('SELECT count FROM usage_day WHERE identifier = ? AND day_key = ?', (identifier, day_key))
-        day_count = cursor.fetchone()
-        day_count = day_count[0] if day_count else 0
-        
-        cursor.execute('SELECT count FROM usage_month WHERE identifier = ? AND month_key = ?', (identifier, month_key))
-        month_count = cursor.fetchone()
-        month_count = month_count[0] if month_count else 0
-        
-        # Check limits with enhanced user-friendly messages
-        if minute_count >= per_minute_limit:
-            conn.close()
-            seconds_remaining = 60 - now.second
-            return False, f"Per-minute limit exceeded: {minute_count}/{per_minute_limit}. You have reached your maximum requests per minute. Please wait {seconds_remaining} seconds before making your next request."
-        
-        if day_count >= per_day_limit:
-            conn.close()
-            next_day = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-            hours_remaining = int((next_day - now).total_seconds() // 3600)
-            minutes_remaining = int(((next_day - now).total_seconds() % 3600) // 60)
-            return False, f"Daily limit exceeded: {day_count}/{per_day_limit}. You have reached your maximum requests for today. Your limit will reset in {hours_remaining} hours and {minutes_remaining} minutes."
-        
-        if month_count >= per_month_limit:
-            conn.close()
-            if now.month == 12:
-                next_month = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            else:
-                next_month = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            days_remaining = (next_month - now).days
-            return False, f"Monthly limit exceeded: {month_count}/{per_month_limit}. You have reached your maximum requests for this month. Your limit will reset in {days_remaining} days."
+    # The lock makes check-then-increment atomic and keeps a flush from landing between
+    # reading the stored counts and reading the pending ones
+    with USAGE_LOCK, db_manager.get_connection() as conn:
+        cursor = conn.cursor()
         
-        # Increment counters atomically
-        cursor.execute('''
-            INSERT INTO usage_minute (identifier, identifier_type, minute_key, count)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(identifier, minute_key) DO UPDATE SET count = count + 1
-        ''', (identifier, identifier_type, minute_key))
+        minute_key, day_key, month_key = get_time_keys()
+        now = datetime.now()
         
-        cursor.execute('''
-            INSERT INTO usage_day (identifier, identifier_type, day_key, count)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(identifier, day_key) DO UPDATE SET count = count + 1
-        ''', (identifier, identifier_type, day_key))
+        try:
+            # Check current usage: what is already stored plus increments not yet flushed
+            minute_id = ('usage_minute', identifier, identifier_type, minute_key)
+            day_id = ('usage_day', identifier, identifier_type, day_key)
+            month_id = ('usage_month', identifier, identifier_type, month_key)
+            
+            # All three stored counts in one statement (NULL when a bucket has no row yet)
+            cursor.execute('''
+                SELECT
+                    (SELECT count FROM usage_minute WHERE identifier = ? AND identifier_type = ? AND minute_key = ?),
+                    (SELECT count FROM usage_day WHERE identifier = ? AND identifier_type = ? AND day_key = ?),
+                    (SELECT count FROM usage_month WHERE identifier = ? AND identifier_type = ? AND month_key = ?)
+            ''', (identifier, identifier_type, minute_key, identifier, identifier_type, day_key,
+                  identifier, identifier_type, month_key))
+            stored_minute, stored_day, stored_month = cursor.fetchone()
+            
+            minute_count = (stored_minute or 0) + PENDING_USAGE[minute_id]
+            day_count = (stored_day or 0) + PENDING_USAGE[day_id]
+            month_count = (stored_month or 0) + PENDING_USAGE[month_id]
+            
+            # Check limits with enhanced user-friendly messages
+            if minute_count >= per_minute_limit:
+                seconds_remaining = 60 - now.second
+                return False, f"Per-minute limit exceeded: {minute_count}/{per_minute_limit}. You have reached your maximum requests per minute. Please wait {seconds_remaining} seconds before making your next request."
+            
+            if day_count >= per_day_limit:
+                next_day = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+                hours_remaining = int((next_day - now).total_seconds() // 3600)
+                minutes_remaining = int(((next_day - now).total_seconds() % 3600) // 60)
+                return False, f"Daily limit exceeded: {day_count}/{per_day_limit}. You have reached your maximum requests for today. Your limit will reset in {hours_remaining} hours and {minutes_remaining} minutes."
+            
+            if month_count >= per_month_limit:
+                if now.month == 12:
+                    next_month = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+                else:
+                    next_month = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+                days_remaining = (next_month - now).days
+                return False, f"Monthly limit exceeded: {month_count}/{per_month_limit}. You have reached your maximum requests for this month. Your limit will reset in {days_remaining} days."
+            
+            # Count the request in memory; usage_flush_loop writes it out in batches
+            PENDING_USAGE[minute_id] += 1
+            PENDING_USAGE[('usage_hour', identifier, identifier_type, minute_key[:13])] += 1
+            PENDING_USAGE[day_id] += 1
+            PENDING_USAGE[month_id] += 1
+            return True, "Usage incremented successfully"
+            
+        except Exception as e:
+            return False, f"Database error: {str(e)}"
+
+def flush_usage_counts() -> int:
+    """Write buffered usage increments to the database and return how many rows changed"""
+    with USAGE_LOCK:
+        if not PENDING_USAGE:
+            return 0
         
-        cursor.execute('''
-            INSERT INTO usage_month (identifier, identifier_type, month_key, count)
-            VALUES (?, ?, ?, 1)
-            ON CONFLICT(identifier, month_key) DO UPDATE SET count = count + 1
-        ''', (identifier, identifier_type, month_key))
+        rows = {table: [] for table in USAGE_BUCKET_COLUMNS}
+        for (table, identifier, identifier_type, bucket_key), count in PENDING_USAGE.items():
+            rows[table].append((identifier, identifier_type, bucket_key, count))
         
-        conn.commit()
-        conn.close()
-        return True, "Usage incremented successfully"
+        with db_manager.get_connection() as conn:
+            for table, bucket_column in USAGE_BUCKET_COLUMNS.items():
+                # No conflict target, so this upserts against whichever unique
+                # constraint the table was created with
+                conn.executemany(f'''
+                    INSERT INTO {table} (identifier, identifier_type, {bucket_column}, count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT DO UPDATE SET count = count + excluded.count
+                ''', rows[table])
+            conn.commit()
         
-    except Exception as e:
-        conn.rollback()
-        conn.close()
-        return False, f"Database error: {str(e)}"
+        # Only forget the increments once they are committed; a failed flush retries them
+        flushed = len(PENDING_USAGE)
+        PENDING_USAGE.clear()
+        return flushed
 
 def get_api_key_limits(key_hash: str):
     """Get API key limits from database"""
+    limits = API_KEY_CACHE.get(key_hash)
+    if limits is not TTLCache.MISSING:
+        return limits
+    
     with db_manager.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -1257,14 +1726,16 @@ def get_api_key_limits(key_hash: str):
             FROM api_keys WHERE key_hash = ?
         ''', (key_hash,))
         result = cursor.fetchone()
+        limits = None
         if result:
-            return {
+            limits = {
                 'per_minute_limit': result[0],
                 'per_day_limit': result[1], 
                 'per_month_limit': result[2],
                 'is_active': bool(result[3])
             }
-        return None
+        API_KEY_CACHE[key_hash] = limits
+        return limits
 
 def get_domain_limits(domain: str):
     """Get domain limits from database"""
@@ -1376,56 +1847,131 @@ def is_bypass_active(request) -> bool:
 def log_diagnostic(request, outcome: str, reason_code: str, **kwargs) -> None:
     """Log diagnostic information to the database"""
     try:
-        conn = sqlite3.connect('astrology_db.sqlite3')
-        cursor = conn.cursor()
-        
-        # Extract request information safely
-        client_ip = get_client_ip(request)
-        path = getattr(request.url, 'path', '') if hasattr(request, 'url') else kwargs.get('path', '')
-        origin = request.headers.get('Origin', '') if hasattr(request, 'headers') else kwargs.get('origin', '')
-        user_agent = request.headers.get('User-Agent', '') if hasattr(request, 'headers') else kwargs.get('user_agent', '')
-        
-        # Generate a request ID for tracking
-        request_id = hashlib.sha256(f"{client_ip}{path}{datetime.now().isoformat()}".encode()).hexdigest()[:16]
-        
-        # Extract authorization info safely
-        auth_header = request.headers.get('Authorization', '') if hasattr(request, 'headers') else kwargs.get('auth_header', '')
-        auth_present = bool(auth_header)
-        auth_scheme = ''
-        key_hash_prefix = ''
-        
-        if auth_header:
-            parts = auth_header.split(' ', 1)
-            auth_scheme = parts[0] if parts else ''
-            if len(parts) > 1 and auth_scheme.lower() == 'bearer':
-                api_key = parts[1]
-                key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-                key_hash_prefix = key_hash[:8]  # Only store prefix for security
-        
-        # Insert diagnostic log
-        cursor.execute('''
-            INSERT INTO api_diagnostics (
-                request_id, path, client_ip, origin, user_agent, auth_scheme, 
-                auth_present, key_hash_prefix, key_active, key_exists, domain, 
-                outcome, reason_code, rl_minute, rl_day, rl_month,
-                rl_minute_limit, rl_day_limit, rl_month_limit
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            request_id, path, client_ip, origin, user_agent[:500], auth_scheme,
-            auth_present, key_hash_prefix, kwargs.get('key_active', None),
-            kwargs.get('key_exists', None), kwargs.get('domain', ''),
-            outcome, reason_code, kwargs.get('rl_minute', None),
-            kwargs.get('rl_day', None), kwargs.get('rl_month', None),
-            kwargs.get('rl_minute_limit', None), kwargs.get('rl_day_limit', None),
-            kwargs.get('rl_month_limit', None)
-        ))
-        
-        conn.commit()
-        conn.close()
+        with db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Extract request information safely
+            client_ip = get_client_ip(request)
+            path = getattr(request.url, 'path', '') if hasattr(request, 'url') else kwargs.get('path', '')
+            origin = request.headers.get('Origin', '') if hasattr(request, 'headers') else kwargs.get('origin', '')
+            user_agent = request.headers.get('User-Agent', '') if hasattr(request, 'headers') else kwargs.get('user_agent', '')
+            
+            # Generate a request ID for tracking
+            request_id = hashlib.sha256(f"{client_ip}{path}{datetime.now().isoformat()}".encode()).hexdigest()[:16]
+            
+            # Extract authorization info safely
+            auth_header = request.headers.get('Authorization', '') if hasattr(request, 'headers') else kwargs.get('auth_header', '')
+            auth_present = bool(auth_header)
+            auth_scheme = ''
+            key_hash_prefix = ''
+            
+            if auth_header:
+                parts = auth_header.split(' ', 1)
+                auth_scheme = parts[0] if parts else ''
+                if len(parts) > 1 and auth_scheme.lower() == 'bearer':
+                    api_key = parts[1]
+                    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+                    key_hash_prefix = key_hash[:8]  # Only store prefix for security
+            
+            # Insert diagnostic log
+            cursor.execute('''
+                INSERT INTO api_diagnostics (
+                    request_id, path, client_ip, origin, user_agent, auth_scheme, 
+                    auth_present, key_hash_prefix, key_active, key_exists, domain, 
+                    outcome, reason_code, rl_minute, rl_day, rl_month,
+                    rl_minute_limit, rl_day_limit, rl_month_limit
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                request_id, path, client_ip, origin, user_agent[:500], auth_scheme,
+                auth_present, key_hash_prefix, kwargs.get('key_active', None),
+                kwargs.get('key_exists', None), kwargs.get('domain', ''),
+                outcome, reason_code, kwargs.get('rl_minute', None),
+                kwargs.get('rl_day', None), kwargs.get('rl_month', None),
+                kwargs.get('rl_minute_limit', None), kwargs.get('rl_day_limit', None),
+                kwargs.get('rl_month_limit', None)
+            ))
+            
+            conn.commit()
     except Exception as e:
         # Don't let logging errors break the application
         print(f"Diagnostic logging error: {e}")
 
+def _diagnostic_log_queries(where_clause: str):
+    """Return the (count, page) SQL pair for one diagnostic log filter combination"""
+    count_query = f'SELECT COUNT(*) FROM api_diagnostics {where_clause}'
+    page_query = f'''
+            SELECT {', '.join(DIAGNOSTIC_LOG_FIELDS)}
+            FROM api_diagnostics
+            {where_clause}
+            ORDER BY ts DESC, id DESC
+            LIMIT ? OFFSET ?
+        '''
+    return count_query, page_query
+
+# SQL for every filter combination, keyed by (outcome given, client_ip given).
+# Built once so each call passes identical text and hits sqlite3's statement cache
+# on the thread-local connection instead of recompiling the query.
+DIAGNOSTIC_LOG_QUERIES = {
+    # Unfiltered total comes from the trigger-maintained counter row
+    (False, False): (
+        'SELECT total FROM api_diagnostics_count WHERE id = 1',
+        _diagnostic_log_queries('')[1]
+    ),
+    (True, False): _diagnostic_log_queries('WHERE outcome = ?'),
+    (False, True): _diagnostic_log_queries('WHERE client_ip = ?'),
+    (True, True): _diagnostic_log_queries('WHERE outcome = ? AND client_ip = ?'),
+}
+
+def diagnostic_log_entry(row) -> dict:
+    """Convert an api_diagnostics row into a JSON-ready dict"""
+    # Rows come straight from our own table, so skip Pydantic entirely and
+    # only coerce the SQLite integer booleans before handing plain dicts to orjson
+    entry = dict(zip(DIAGNOSTIC_LOG_FIELDS, row))
+    entry['auth_present'] = bool(row[8])
+    entry['key_active'] = None if row[10] is None else bool(row[10])
+    entry['key_exists'] = None if row[11] is None else bool(row[11])
+    return entry
+
+def fetch_diagnostic_logs(page: int, page_size: int, outcome: Optional[str] = None, client_ip: Optional[str] = None):
+    """Fetch the total count and one page of raw diagnostic log rows"""
+    count_query, page_query = DIAGNOSTIC_LOG_QUERIES[(bool(outcome), bool(client_ip))]
+    params = [value for value in (outcome, client_ip) if value]
+    
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Read the count and the page from one snapshot so they agree while logging
+        # continues to write; rolling back just ends the read-only transaction
+        cursor.execute('BEGIN DEFERRED')
+        try:
+            # Get total count. Kept as its own statement on purpose: it is answered from a
+            # covering index, whereas COUNT(*) OVER () in the page query forces SQLite to
+            # read every matching row before applying LIMIT
+            cursor.execute(count_query, params)
+            total = cursor.fetchone()[0]
+            
+            # Get paginated results
+            offset = (page - 1) * page_size
+            cursor.execute(page_query, params + [page_size, offset])
+            
+            return total, cursor.fetchall()
+        finally:
+            conn.rollback()
+
+# Rows encoded per chunk when streaming diagnostic logs
+DIAGNOSTIC_LOG_STREAM_BATCH = 100
+
+async def stream_diagnostic_logs(rows: list, total: int, page: int, page_size: int):
+    """Yield the logs page as JSON, encoding rows in batches instead of building one big string"""
+    yield b'{"logs":['
+    for start in range(0, len(rows), DIAGNOSTIC_LOG_STREAM_BATCH):
+        batch = b','.join(
+            orjson.dumps(diagnostic_log_entry(row))
+            for row in rows[start:start + DIAGNOSTIC_LOG_STREAM_BATCH]
+        )
+        yield (b',' if start else b'') + batch
+    yield b'],"total":%d,"page":%d,"page_size":%d}' % (total, page, page_size)
+
 # Analytics functions
 def get_usage_analytics(days: int = 30, view_type: str = "all", identifier: Optional[str] = None, period: Optional[str] = None):
     """Get comprehensive usage analytics for the last N days
@@ -1436,629 +1982,614 @@ def get_usage_analytics(days: int = 30, view_type: str = "all", identifier: Opti
         identifier: Optional specific API key hash or domain to filter by
         period: Special period handling ('today', 'yesterday', or None for normal days)
     """
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    # Calculate date range based on period
-    if period == "today":
-        start_date = end_date = datetime.now().date()
-    elif period == "yesterday":
-        start_date = end_date = datetime.now().date() - timedelta(days=1)
-    else:
-        # Standard date range
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days)
-    
-    try:
-        # Get daily usage for line chart
-        if identifier:
-            # Filter by specific identifier
-            cursor.execute('''
-                SELECT day_key, 
-                       identifier_type,
-                       SUM(count) as total_requests
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ? AND identifier = ?
-                GROUP BY day_key, identifier_type
-                ORDER BY day_key
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
-        elif view_type == "all":
-            cursor.execute('''
-                SELECT day_key, 
-                       identifier_type,
-                       SUM(count) as total_requests
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ?
-                GROUP BY day_key, identifier_type
-                ORDER BY day_key
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-        else:
-            cursor.execute('''
-                SELECT day_key, 
-                       identifier_type,
-                       SUM(count) as total_requests
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ? AND identifier_type = ?
-                GROUP BY day_key, identifier_type
-                ORDER BY day_key
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), view_type))
-        
-        daily_usage_raw = cursor.fetchall()
-        
-        # Process daily usage data
-        daily_usage = {}
-        for row in daily_usage_raw:
-            day_key, identifier_type, count = row
-            if day_key not in daily_usage:
-                daily_usage[day_key] = {'api_key': 0, 'domain': 0, 'total': 0}
-            daily_usage[day_key][identifier_type] = count
-            daily_usage[day_key]['total'] += count
-        
-        # Fill in missing days with zeros
-        current_date = start_date
-        while current_date <= end_date:
-            day_key = current_date.strftime('%Y-%m-%d')
-            if day_key not in daily_usage:
-                daily_usage[day_key] = {'api_key': 0, 'domain': 0, 'total': 0}
-            current_date += timedelta(days=1)
-        
-        # Get total statistics
-        if identifier:
-            # For specific identifier, get stats for that identifier only
-            cursor.execute('''
-                SELECT identifier_type, 
-                       SUM(count) as total_requests,
-                       COUNT(DISTINCT identifier) as unique_identifiers
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ? AND identifier = ?
-                GROUP BY identifier_type
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
-        elif view_type == "all":
-            cursor.execute('''
-                SELECT identifier_type, 
-                       SUM(count) as total_requests,
-                       COUNT(DISTINCT identifier) as unique_identifiers
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ?
-                GROUP BY identifier_type
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Calculate date range based on period
+        if period == "today":
+            start_date = end_date = datetime.now().date()
+        elif period == "yesterday":
+            start_date = end_date = datetime.now().date() - timedelta(days=1)
         else:
+            # Standard date range
+            end_date = datetime.now().date()
+            start_date = end_date - timedelta(days=days)
+        
+        try:
+            # Get daily usage for line chart
+            if identifier:
+                # Filter by specific identifier
+                cursor.execute('''
+                    SELECT day_key, 
+                           identifier_type,
+                           SUM(count) as total_requests
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ? AND identifier = ?
+                    GROUP BY day_key, identifier_type
+                    ORDER BY day_key
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
+            elif view_type == "all":
+                cursor.execute('''
+                    SELECT day_key, 
+                           identifier_type,
+                           SUM(count) as total_requests
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ?
+                    GROUP BY day_key, identifier_type
+                    ORDER BY day_key
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            else:
+                cursor.execute('''
+                    SELECT day_key, 
+                           identifier_type,
+                           SUM(count) as total_requests
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ? AND identifier_type = ?
+                    GROUP BY day_key, identifier_type
+                    ORDER BY day_key
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), view_type))
+            
+            # Process daily usage data over a zero-filled day range
+            daily_usage = {
+                (start_date + timedelta(days=i)).strftime('%Y-%m-%d'): {'api_key': 0, 'domain': 0, 'total': 0}
+                for i in range((end_date - start_date).days + 1)
+            }
+            for day_key, identifier_type, count in cursor.fetchall():
+                day = daily_usage[day_key]
+                day[identifier_type] = count
+                day['total'] += count
+            
+            # Get total statistics
+            if identifier:
+                # For specific identifier, get stats for that identifier only
+                cursor.execute('''
+                    SELECT identifier_type, 
+                           SUM(count) as total_requests,
+                           COUNT(DISTINCT identifier) as unique_identifiers
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ? AND identifier = ?
+                    GROUP BY identifier_type
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
+            elif view_type == "all":
+                cursor.execute('''
+                    SELECT identifier_type, 
+                           SUM(count) as total_requests,
+                           COUNT(DISTINCT identifier) as unique_identifiers
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ?
+                    GROUP BY identifier_type
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+            else:
+                cursor.execute('''
+                    SELECT identifier_type, 
+                           SUM(count) as total_requests,
+                           COUNT(DISTINCT identifier) as unique_identifiers
+                    FROM usage_day 
+                    WHERE day_key >= ? AND day_key <= ? AND identifier_type = ?
+                    GROUP BY identifier_type
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), view_type))
+            
+            totals = {'api_key': {'requests': 0, 'unique': 0}, 'domain': {'requests': 0, 'unique': 0}}
+            for identifier_type, total_requests, unique_identifiers in cursor.fetchall():
+                totals[identifier_type] = {'requests': total_requests, 'unique': unique_identifiers}
+            
+            top_api_keys = []
+            top_domains = []
+            if not identifier and view_type == "all":
+                # Both top-10 lists from a single aggregation of the usage_day slice. Domains have
+                # no description column (init_database never creates one), so they report NULL
+                cursor.execute('''
+                    WITH slice AS MATERIALIZED (
+                        SELECT identifier, identifier_type, SUM(count) as total_requests
+                        FROM usage_day
+                        WHERE day_key >= ? AND day_key <= ?
+                        GROUP BY identifier, identifier_type
+                    )
+                    SELECT * FROM (
+                        SELECT 'api_key', ak.name, ak.description, s.total_requests
+                        FROM slice s
+                        JOIN api_keys ak ON s.identifier = ak.key_hash
+                        WHERE s.identifier_type = 'api_key'
+                        ORDER BY s.total_requests DESC
+                        LIMIT 10
+                    )
+                    UNION ALL
+                    SELECT * FROM (
+                        SELECT 'domain', ad.domain, NULL, s.total_requests
+                        FROM slice s
+                        JOIN authorized_domains ad ON s.identifier = ad.domain
+                        WHERE s.identifier_type = 'domain'
+                        ORDER BY s.total_requests DESC
+                        LIMIT 10
+                    )
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                
+                for identifier_type, name, description, requests in cursor.fetchall():
+                    if identifier_type == 'api_key':
+                        top_api_keys.append({'name': name, 'description': description or 'No description', 'requests': requests})
+                    else:
+                        top_domains.append({'domain': name, 'description': description or 'No description', 'requests': requests})
+            
+            # Get top API keys by usage (only if view_type allows)
+            if identifier and view_type == "api_key":
+                # For specific API key, show just that key
+                cursor.execute('''
+                    SELECT ak.name, ak.description, SUM(ud.count) as total_requests
+                    FROM usage_day ud
+                    JOIN api_keys ak ON ud.identifier = ak.key_hash
+                    WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier = ? AND ud.identifier_type = 'api_key'
+                    GROUP BY ud.identifier, ak.name, ak.description
+                    ORDER BY total_requests DESC
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
+            elif not identifier and view_type == "api_key":
+                cursor.execute('''
+                    SELECT ak.name, ak.description, SUM(ud.count) as total_requests
+                    FROM usage_day ud
+                    JOIN api_keys ak ON ud.identifier = ak.key_hash
+                    WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier_type = 'api_key'
+                    GROUP BY ud.identifier, ak.name, ak.description
+                    ORDER BY total_requests DESC
+                    LIMIT 10
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                
+                top_api_keys = [
+                    {'name': name, 'description': description or 'No description', 'requests': requests}
+                    for name, description, requests in cursor.fetchall()
+                ]
+            
+            # Get top domains by usage (only if view_type allows)
+            if identifier and view_type == "domain":
+                # For specific domain, show just that domain
+                cursor.execute('''
+                    SELECT ad.domain, NULL, SUM(ud.count) as total_requests
+                    FROM usage_day ud
+                    JOIN authorized_domains ad ON ud.identifier = ad.domain
+                    WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier = ? AND ud.identifier_type = 'domain'
+                    GROUP BY ud.identifier, ad.domain
+                    ORDER BY total_requests DESC
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
+            elif not identifier and view_type == "domain":
+                cursor.execute('''
+                    SELECT ad.domain, NULL, SUM(ud.count) as total_requests
+                    FROM usage_day ud
+                    JOIN authorized_domains ad ON ud.identifier = ad.domain
+                    WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier_type = 'domain'
+                    GROUP BY ud.identifier, ad.domain
+                    ORDER BY total_requests DESC
+                    LIMIT 10
+                ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                
+                top_domains = [
+                    {'domain': domain, 'description': description or 'No description', 'requests': requests}
+                    for domain, description, requests in cursor.fetchall()
+                ]
+            
+            # Get hourly distribution (for current day) from the usage_hour rollup
+            today = datetime.now().strftime('%Y-%m-%d')
+            hour_range = (f'{today}-00', f'{today}-23')
+            if identifier:
+                # For specific identifier, get hourly data for that identifier
+                cursor.execute('''
+                    SELECT SUBSTR(hour_key, 12, 2) as hour, SUM(count) as requests
+                    FROM usage_hour
+                    WHERE hour_key >= ? AND hour_key <= ? AND identifier = ?
+                    GROUP BY hour
+                    ORDER BY hour
+                ''', (*hour_range, identifier))
+            elif view_type == "all":
+                cursor.execute('''
+                    SELECT SUBSTR(hour_key, 12, 2) as hour, SUM(count) as requests
+                    FROM usage_hour
+                    WHERE hour_key >= ? AND hour_key <= ?
+                    GROUP BY hour
+                    ORDER BY hour
+                ''', hour_range)
+            else:
+                # For filtered views, get hourly data only for the selected type
+                cursor.execute('''
+                    SELECT SUBSTR(hour_key, 12, 2) as hour, SUM(count) as requests
+                    FROM usage_hour
+                    WHERE hour_key >= ? AND hour_key <= ? AND identifier_type = ?
+                    GROUP BY hour
+                    ORDER BY hour
+                ''', (*hour_range, view_type))
+            
+            hourly_distribution = dict.fromkeys(range(24), 0)
+            for hour, requests in cursor.fetchall():
+                hourly_distribution[int(hour)] = requests
+            
+            return {
+                'daily_usage': daily_usage,
+                'totals': totals,
+                'top_api_keys': top_api_keys,
+                'top_domains': top_domains,
+                'hourly_distribution': hourly_distribution,
+                'date_range': {
+                    'start': start_date.strftime('%Y-%m-%d'),
+                    'end': end_date.strftime('%Y-%m-%d'),
+                    'days': days
+                },
+                'view_type': view_type
+            }
+            
+        except Exception as e:
+            raise Exception(f"Analytics query error: {str(e)}")
+
+def get_usage_summary():
+    """Get quick summary statistics"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            now = datetime.now()
+            today = now.strftime('%Y-%m-%d')
+            yesterday = (now.date() - timedelta(days=1)).strftime('%Y-%m-%d')
+            this_month = now.strftime('%Y-%m')
+            seven_days_ago = (now.date() - timedelta(days=7)).strftime('%Y-%m-%d')
+            
+            # All six figures in one statement: today's, yesterday's and this month's usage,
+            # active keys and domains, and the average daily requests over the last 7 days
             cursor.execute('''
-                SELECT identifier_type, 
-                       SUM(count) as total_requests,
-                       COUNT(DISTINCT identifier) as unique_identifiers
-                FROM usage_day 
-                WHERE day_key >= ? AND day_key <= ? AND identifier_type = ?
-                GROUP BY identifier_type
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), view_type))
-        
-        totals_raw = cursor.fetchall()
-        totals = {'api_key': {'requests': 0, 'unique': 0}, 'domain': {'requests': 0, 'unique': 0}}
-        
-        for row in totals_raw:
-            identifier_type, total_requests, unique_identifiers = row
-            totals[identifier_type] = {'requests': total_requests, 'unique': unique_identifiers}
-        
-        # Get top API keys by usage (only if view_type allows)
-        top_api_keys = []
-        if identifier and view_type == "api_key":
-            # For specific API key, show just that key
-            cursor.execute('''
-                SELECT ak.name, ak.description, SUM(ud.count) as total_requests
-                FROM usage_day ud
-                JOIN api_keys ak ON ud.identifier = ak.key_hash
-                WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier = ? AND ud.identifier_type = 'api_key'
-                GROUP BY ud.identifier, ak.name, ak.description
-                ORDER BY total_requests DESC
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
-        elif not identifier and view_type in ["all", "api_key"]:
+                SELECT
+                    (SELECT SUM(count) FROM usage_day WHERE day_key = ?),
+                    (SELECT SUM(count) FROM usage_day WHERE day_key = ?),
+                    (SELECT SUM(count) FROM usage_month WHERE month_key = ?),
+                    (SELECT COUNT(*) FROM api_keys WHERE is_active = 1),
+                    (SELECT COUNT(*) FROM authorized_domains WHERE is_active = 1),
+                    (SELECT AVG(daily_total) FROM (
+                        SELECT day_key, SUM(count) as daily_total
+                        FROM usage_day
+                        WHERE day_key >= ?
+                        GROUP BY day_key
+                    ))
+            ''', (today, yesterday, this_month, seven_days_ago))
+            
+            (today_requests, yesterday_requests, month_requests,
+             active_api_keys, active_domains, avg_daily) = cursor.fetchone()
+            today_requests = today_requests or 0
+            yesterday_requests = yesterday_requests or 0
+            month_requests = month_requests or 0
+            avg_daily = avg_daily or 0
+            
+            return {
+                'today_requests': today_requests,
+                'yesterday_requests': yesterday_requests,
+                'month_requests': month_requests,
+                'active_api_keys': active_api_keys,
+                'active_domains': active_domains,
+                'avg_daily_requests': round(avg_daily, 1)
+            }
+            
+        except Exception as e:
+            raise Exception(f"Summary query error: {str(e)}")
+
+def get_rate_limit_violations():
+    """Get recent rate limit violations for monitoring"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            # Get API keys that hit limits recently
+            yesterday = (datetime.now().date() - timedelta(days=1)).strftime('%Y-%m-%d')
             cursor.execute('''
-                SELECT ak.name, ak.description, SUM(ud.count) as total_requests
-                FROM usage_day ud
-                JOIN api_keys ak ON ud.identifier = ak.key_hash
-                WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier_type = 'api_key'
-                GROUP BY ud.identifier, ak.name, ak.description
-                ORDER BY total_requests DESC
-                LIMIT 10
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                SELECT ak.name, ak.per_minute_limit, ak.per_day_limit, ak.per_month_limit,
+                       MAX(ud.count) as max_daily_usage
+                FROM api_keys ak
+                LEFT JOIN usage_day ud ON ak.key_hash = ud.identifier AND ud.day_key >= ?
+                WHERE ak.is_active = 1
+                GROUP BY ak.key_hash, ak.name, ak.per_minute_limit, ak.per_day_limit, ak.per_month_limit
+                HAVING max_daily_usage >= ak.per_day_limit * 0.8
+                ORDER BY max_daily_usage DESC
+            ''', (yesterday,))
             
+            api_key_violations = []
             for row in cursor.fetchall():
-                name, description, requests = row
-                top_api_keys.append({
+                name, per_min, per_day, per_month, max_usage = row
+                violation_percentage = (max_usage / per_day * 100) if per_day > 0 else 0
+                api_key_violations.append({
                     'name': name,
-                    'description': description or 'No description',
-                    'requests': requests
+                    'max_usage': max_usage or 0,
+                    'daily_limit': per_day,
+                    'violation_percentage': round(violation_percentage, 1)
                 })
-        
-        # Get top domains by usage (only if view_type allows)
-        top_domains = []
-        if identifier and view_type == "domain":
-            # For specific domain, show just that domain
-            cursor.execute('''
-                SELECT ad.domain, ad.description, SUM(ud.count) as total_requests
-                FROM usage_day ud
-                JOIN authorized_domains ad ON ud.identifier = ad.domain
-                WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier = ? AND ud.identifier_type = 'domain'
-                GROUP BY ud.identifier, ad.domain, ad.description
-                ORDER BY total_requests DESC
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'), identifier))
-        elif not identifier and view_type in ["all", "domain"]:
+            
+            # Get domains that hit limits recently
             cursor.execute('''
-                SELECT ad.domain, ad.description, SUM(ud.count) as total_requests
-                FROM usage_day ud
-                JOIN authorized_domains ad ON ud.identifier = ad.domain
-                WHERE ud.day_key >= ? AND ud.day_key <= ? AND ud.identifier_type = 'domain'
-                GROUP BY ud.identifier, ad.domain, ad.description
-                ORDER BY total_requests DESC
-                LIMIT 10
-            ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+                SELECT ad.domain, ad.per_minute_limit, ad.per_day_limit, ad.per_month_limit,
+                       MAX(ud.count) as max_daily_usage
+                FROM authorized_domains ad
+                LEFT JOIN usage_day ud ON ad.domain = ud.identifier AND ud.day_key >= ?
+                WHERE ad.is_active = 1
+                GROUP BY ad.domain, ad.per_minute_limit, ad.per_day_limit, ad.per_month_limit
+                HAVING max_daily_usage >= ad.per_day_limit * 0.8
+                ORDER BY max_daily_usage DESC
+            ''', (yesterday,))
             
+            domain_violations = []
             for row in cursor.fetchall():
-                domain, description, requests = row
-                top_domains.append({
+                domain, per_min, per_day, per_month, max_usage = row
+                violation_percentage = (max_usage / per_day * 100) if per_day > 0 else 0
+                domain_violations.append({
                     'domain': domain,
-                    'description': description or 'No description',
-                    'requests': requests
+                    'max_usage': max_usage or 0,
+                    'daily_limit': per_day,
+                    'violation_percentage': round(violation_percentage, 1)
                 })
-        
-        # Get hourly distribution (for current day)
-        today = datetime.now().strftime('%Y-%m-%d')
-        if identifier:
-            # For specific identifier, get hourly data for that identifier
-            cursor.execute('''
-                SELECT SUBSTR(minute_key, 12, 2) as hour, SUM(count) as requests
-                FROM usage_minute
-                WHERE minute_key LIKE ? || '%' AND identifier = ?
-                GROUP BY hour
-                ORDER BY hour
-            ''', (today, identifier))
-        elif view_type == "all":
-            cursor.execute('''
-                SELECT SUBSTR(minute_key, 12, 2) as hour, SUM(count) as requests
-                FROM usage_minute
-                WHERE minute_key LIKE ? || '%'
-                GROUP BY hour
-                ORDER BY hour
-            ''', (today,))
-        else:
-            # For filtered views, get hourly data only for the selected type
-            cursor.execute('''
-                SELECT SUBSTR(minute_key, 12, 2) as hour, SUM(count) as requests
-                FROM usage_minute
-                WHERE minute_key LIKE ? || '%' AND identifier_type = ?
-                GROUP BY hour
-                ORDER BY hour
-            ''', (today, view_type))
-        
-        hourly_distribution = {}
-        for row in cursor.fetchall():
-            hour, requests = row
-            hourly_distribution[int(hour)] = requests
-        
-        # Fill in missing hours with zeros
-        for hour in range(24):
-            if hour not in hourly_distribution:
-                hourly_distribution[hour] = 0
-        
-        conn.close()
-        
-        return {
-            'daily_usage': daily_usage,
-            'totals': totals,
-            'top_api_keys': top_api_keys,
-            'top_domains': top_domains,
-            'hourly_distribution': hourly_distribution,
-            'date_range': {
-                'start': start_date.strftime('%Y-%m-%d'),
-                'end': end_date.strftime('%Y-%m-%d'),
-                'days': days
-            },
-            'view_type': view_type
-        }
-        
-    except Exception as e:
-        conn.close()
-        raise Exception(f"Analytics query error: {str(e)}")
+            
+            return {
+                'api_key_violations': api_key_violations,
+                'domain_violations': domain_violations
+            }
+            
+        except Exception as e:
+            raise Exception(f"Violations query error: {str(e)}")
 
-def get_usage_summary():
-    """Get quick summary statistics"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    try:
-        # Get today's usage
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT SUM(count) as today_requests
-            FROM usage_day 
-            WHERE day_key = ?
-        ''', (today,))
-        
-        today_requests = cursor.fetchone()[0] or 0
-        
-        # Get yesterday's usage
-        yesterday = (datetime.now().date() - timedelta(days=1)).strftime('%Y-%m-%d')
+def get_analytics_api_key_options():
+    """Active API keys for the analytics dropdown, by name"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
         cursor.execute('''
-            SELECT SUM(count) as yesterday_requests
-            FROM usage_day 
-            WHERE day_key = ?
-        ''', (yesterday,))
-        
-        yesterday_requests = cursor.fetchone()[0] or 0
-        
-        # Get this month's usage
-        this_month = datetime.now().strftime('%Y-%m')
+            SELECT key_hash, name, description, is_active
+            FROM api_keys 
+            WHERE is_active = 1
+            ORDER BY name
+        ''')
+        return [
+            {'key_hash': key_hash, 'name': name, 'description': description or 'No description', 'is_active': bool(is_active)}
+            for key_hash, name, description, is_active in cursor.fetchall()
+        ]
+
+def get_analytics_domain_options():
+    """Active domains for the analytics dropdown, by domain"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        # authorized_domains has no description column; keep the field for the dropdown
         cursor.execute('''
-            SELECT SUM(count) as month_requests
-            FROM usage_month 
-            WHERE month_key = ?
-        ''', (this_month,))
-        
-        month_requests = cursor.fetchone()[0] or 0
-        
-        # Get total active API keys
-        cursor.execute('SELECT COUNT(*) FROM api_keys WHERE is_active = 1')
-        active_api_keys = cursor.fetchone()[0]
+            SELECT domain, NULL, is_active
+            FROM authorized_domains 
+            WHERE is_active = 1
+            ORDER BY domain
+        ''')
+        return [
+            {'domain': domain, 'description': description or 'No description', 'is_active': bool(is_active)}
+            for domain, description, is_active in cursor.fetchall()
+        ]
+
+# V1 Admin API Enhanced Database Functions - Scalable for large datasets
+# Note: add_database_indexes() function is defined earlier and called during startup
+
+def get_api_keys_v1(page: int = 1, page_size: int = 25, search: str = "", 
+                   sort_by: APIKeySortField = APIKeySortField.created_at, sort_order: SortOrder = SortOrder.desc,
+                   is_active: Optional[bool] = None, created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    """Enhanced API keys retrieval with full filtering, sorting, and pagination"""
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
-        # Get total active domains
-        cursor.execute('SELECT COUNT(*) FROM authorized_domains WHERE is_active = 1')
-        active_domains = cursor.fetchone()[0]
+        # Build WHERE clause dynamically
+        where_conditions = []
+        params = []
         
-        # Get average daily requests (last 7 days)
-        seven_days_ago = (datetime.now().date() - timedelta(days=7)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT AVG(daily_total) as avg_daily
-            FROM (
-                SELECT day_key, SUM(count) as daily_total
-                FROM usage_day
-                WHERE day_key >= ?
-                GROUP BY day_key
-            )
-        ''', (seven_days_ago,))
+        # Search functionality
+        if search:
+            condition, search_params = api_key_search_condition(search)
+            where_conditions.append(condition)
+            params.extend(search_params)
+        
+        # Status filter
+        if is_active is not None:
+            where_conditions.append('is_active = ?')
+            params.append(is_active)
+        
+        # Date filters (now properly validated)
+        if created_after:
+            where_conditions.append('created_at >= ?')
+            params.append(created_after.isoformat())
+        if created_before:
+            where_conditions.append('created_at <= ?')
+            params.append(created_before.isoformat())
         
-        avg_daily = cursor.fetchone()[0] or 0
+        where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
         
-        conn.close()
+        # Use secure enum values - no longer vulnerable to SQL injection
+        order_clause = ORDER_BY_CLAUSES[(sort_by, sort_order)]
         
-        return {
-            'today_requests': today_requests,
-            'yesterday_requests': yesterday_requests,
-            'month_requests': month_requests,
-            'active_api_keys': active_api_keys,
-            'active_domains': active_domains,
-            'avg_daily_requests': round(avg_daily, 1)
-        }
+        # Get total count
+        count_query = f'SELECT COUNT(*) FROM api_keys {where_clause}'
+        cursor.execute(count_query, params)
+        total = cursor.fetchone()[0]
         
-    except Exception as e:
-        conn.close()
-        raise Exception(f"Summary query error: {str(e)}")
-
-def get_rate_limit_violations():
-    """Get recent rate limit violations for monitoring"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    try:
-        # Get API keys that hit limits recently
-        yesterday = (datetime.now().date() - timedelta(days=1)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT ak.name, ak.per_minute_limit, ak.per_day_limit, ak.per_month_limit,
-                   MAX(ud.count) as max_daily_usage
-            FROM api_keys ak
-            LEFT JOIN usage_day ud ON ak.key_hash = ud.identifier AND ud.day_key >= ?
-            WHERE ak.is_active = 1
-            GROUP BY ak.key_hash, ak.name, ak.per_minute_limit, ak.per_day_limit, ak.per_month_limit
-            HAVING max_daily_usage >= ak.per_day_limit * 0.8
-            ORDER BY max_daily_usage DESC
-        ''', (yesterday,))
-        
-        api_key_violations = []
-        for row in cursor.fetchall():
-            name, per_min, per_day, per_month, max_usage = row
-            violation_percentage = (max_usage / per_day * 100) if per_day > 0 else 0
-            api_key_violations.append({
-                'name': name,
-                'max_usage': max_usage or 0,
-                'daily_limit': per_day,
-                'violation_percentage': round(violation_percentage, 1)
-            })
+        # Calculate pagination
+        offset = (page - 1) * page_size
+        total_pages = (total + page_size - 1) // page_size
         
-        # Get domains that hit limits recently
-        cursor.execute('''
-            SELECT ad.domain, ad.per_minute_limit, ad.per_day_limit, ad.per_month_limit,
-                   MAX(ud.count) as max_daily_usage
-            FROM authorized_domains ad
-            LEFT JOIN usage_day ud ON ad.domain = ud.identifier AND ud.day_key >= ?
-            WHERE ad.is_active = 1
-            GROUP BY ad.domain, ad.per_minute_limit, ad.per_day_limit, ad.per_month_limit
-            HAVING max_daily_usage >= ad.per_day_limit * 0.8
-            ORDER BY max_daily_usage DESC
-        ''', (yesterday,))
-        
-        domain_violations = []
-        for row in cursor.fetchall():
-            domain, per_min, per_day, per_month, max_usage = row
-            violation_percentage = (max_usage / per_day * 100) if per_day > 0 else 0
-            domain_violations.append({
-                'domain': domain,
-                'max_usage': max_usage or 0,
-                'daily_limit': per_day,
-                'violation_percentage': round(violation_percentage, 1)
-            })
+        # Get paginated results
+        query = f'''
+            SELECT id, key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit, 
+                   is_active, created_at, updated_at
+            FROM api_keys 
+            {where_clause}
+            {order_clause}
+            LIMIT ? OFFSET ?
+        '''
+        cursor.execute(query, params + [page_size, offset])
         
-        conn.close()
+        items = [{**row, 'is_active': bool(row['is_active'])} for row in cursor.fetchall()]
         
         return {
-            'api_key_violations': api_key_violations,
-            'domain_violations': domain_violations
+            'items': items,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_prev': page > 1
         }
-        
-    except Exception as e:
-        conn.close()
-        raise Exception(f"Violations query error: {str(e)}")
-
-# V1 Admin API Enhanced Database Functions - Scalable for large datasets
-# Note: add_database_indexes() function is defined earlier and called during startup
-
-def get_api_keys_v1(page: int = 1, page_size: int = 25, search: str = "", 
-                   sort_by: APIKeySortField = APIKeySortField.created_at, sort_order: SortOrder = SortOrder.desc,
-                   is_active: Optional[bool] = None, created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
-    """Enhanced API keys retrieval with full filtering, sorting, and pagination"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    # Build WHERE clause dynamically
-    where_conditions = []
-    params = []
-    
-    # Search functionality
-    if search:
-        search_pattern = f'%{search}%'
-        where_conditions.append('(name LIKE ? OR description LIKE ?)')
-        params.extend([search_pattern, search_pattern])
-    
-    # Status filter
-    if is_active is not None:
-        where_conditions.append('is_active = ?')
-        params.append(is_active)
-    
-    # Date filters (now properly validated)
-    if created_after:
-        where_conditions.append('created_at >= ?')
-        params.append(created_after.isoformat())
-    if created_before:
-        where_conditions.append('created_at <= ?')
-        params.append(created_before.isoformat())
-    
-    where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
-    
-    # Use secure enum values - no longer vulnerable to SQL injection
-    order_clause = f'ORDER BY {sort_by.value} {sort_order.value.upper()}'
-    
-    # Get total count
-    count_query = f'SELECT COUNT(*) FROM api_keys {where_clause}'
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
-    
-    # Calculate pagination
-    offset = (page - 1) * page_size
-    total_pages = (total + page_size - 1) // page_size
-    
-    # Get paginated results
-    query = f'''
-        SELECT id, key_hash, name, description, per_minute_limit, per_day_limit, per_month_limit, 
-               is_active, created_at, updated_at
-        FROM api_keys 
-        {where_clause}
-        {order_clause}
-        LIMIT ? OFFSET ?
-    '''
-    cursor.execute(query, params + [page_size, offset])
-    
-    items = []
-    for row in cursor.fetchall():
-        items.append({
-            'id': row[0],
-            'key_hash': row[1],
-            'name': row[2],
-            'description': row[3],
-            'per_minute_limit': row[4],
-            'per_day_limit': row[5],
-            'per_month_limit': row[6],
-            'is_active': bool(row[7]),
-            'created_at': row[8],
-            'updated_at': row[9]
-        })
-    
-    conn.close()
-    
-    return {
-        'items': items,
-        'total': total,
-        'page': page,
-        'page_size': page_size,
-        'total_pages': total_pages,
-        'has_next': page < total_pages,
-        'has_prev': page > 1
-    }
 
 def get_domains_v1(page: int = 1, page_size: int = 25, search: str = "", 
                   sort_by: DomainSortField = DomainSortField.created_at, sort_order: SortOrder = SortOrder.desc,
                   is_active: Optional[bool] = None, created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
     """Enhanced domains retrieval with full filtering, sorting, and pagination"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    # Build WHERE clause dynamically
-    where_conditions = []
-    params = []
-    
-    # Search functionality
-    if search:
-        search_pattern = f'%{search}%'
-        where_conditions.append('domain LIKE ?')
-        params.append(search_pattern)
-    
-    # Status filter
-    if is_active is not None:
-        where_conditions.append('is_active = ?')
-        params.append(is_active)
-    
-    # Date filters (now properly validated)
-    if created_after:
-        where_conditions.append('created_at >= ?')
-        params.append(created_after.isoformat())
-    if created_before:
-        where_conditions.append('created_at <= ?')
-        params.append(created_before.isoformat())
-    
-    where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
-    
-    # Use secure enum values - no longer vulnerable to SQL injection
-    order_clause = f'ORDER BY {sort_by.value} {sort_order.value.upper()}'
-    
-    # Get total count
-    count_query = f'SELECT COUNT(*) FROM authorized_domains {where_clause}'
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
-    
-    # Calculate pagination
-    offset = (page - 1) * page_size
-    total_pages = (total + page_size - 1) // page_size
-    
-    # Get paginated results
-    query = f'''
-        SELECT id, domain, per_minute_limit, per_day_limit, per_month_limit, 
-               is_active, created_at, updated_at
-        FROM authorized_domains 
-        {where_clause}
-        {order_clause}
-        LIMIT ? OFFSET ?
-    '''
-    cursor.execute(query, params + [page_size, offset])
-    
-    items = []
-    for row in cursor.fetchall():
-        items.append({
-            'id': row[0],
-            'domain': row[1],
-            'per_minute_limit': row[2],
-            'per_day_limit': row[3],
-            'per_month_limit': row[4],
-            'is_active': bool(row[5]),
-            'created_at': row[6],
-            'updated_at': row[7]
-        })
-    
-    conn.close()
-    
-    return {
-        'items': items,
-        'total': total,
-        'page': page,
-        'page_size': page_size,
-        'total_pages': total_pages,
-        'has_next': page < total_pages,
-        'has_prev': page > 1
-    }
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        
+        # Build WHERE clause dynamically
+        where_conditions = []
+        params = []
+        
+        # Search functionality
+        if search:
+            search_pattern = f'%{search}%'
+            where_conditions.append('domain LIKE ?')
+            params.append(search_pattern)
+        
+        # Status filter
+        if is_active is not None:
+            where_conditions.append('is_active = ?')
+            params.append(is_active)
+        
+        # Date filters (now properly validated)
+        if created_after:
+            where_conditions.append('created_at >= ?')
+            params.append(created_after.isoformat())
+        if created_before:
+            where_conditions.append('created_at <= ?')
+            params.append(created_before.isoformat())
+        
+        where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
+        
+        # Use secure enum values - no longer vulnerable to SQL injection
+        order_clause = ORDER_BY_CLAUSES[(sort_by, sort_order)]
+        
+        # Get total count
+        count_query = f'SELECT COUNT(*) FROM authorized_domains {where_clause}'
+        cursor.execute(count_query, params)
+        total = cursor.fetchone()[0]
+        
+        # Calculate pagination
+        offset = (page - 1) * page_size
+        total_pages = (total + page_size - 1) // page_size
+        
+        # Get paginated results
+        query = f'''
+            SELECT id, domain, per_minute_limit, per_day_limit, per_month_limit, 
+                   is_active, created_at, updated_at
+            FROM authorized_domains 
+            {where_clause}
+            {order_clause}
+            LIMIT ? OFFSET ?
+        '''
+        cursor.execute(query, params + [page_size, offset])
+        
+        items = [{**row, 'is_active': bool(row['is_active'])} for row in cursor.fetchall()]
+        
+        return {
+            'items': items,
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'has_next': page < total_pages,
+            'has_prev': page > 1
+        }
 
 def bulk_update_api_keys(bulk_op: BulkOperation):
     """Perform bulk operations on API keys with secure validation"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    operation = bulk_op.operation.value  # Initialize early to avoid unbound error
-    try:
-        ids = bulk_op.ids
-        payload = bulk_op.payload
-        
-        # Generate secure placeholders for parameterized queries
-        placeholders = ','.join(['?'] * len(ids))
-        
-        if operation == "delete":
-            cursor.execute(f'DELETE FROM api_keys WHERE id IN ({placeholders})', ids)
-        elif operation == "activate":
-            cursor.execute(f'UPDATE api_keys SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
-        elif operation == "deactivate":
-            cursor.execute(f'UPDATE api_keys SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
-        elif operation == "update_limits" and payload is not None:
-            # Payload is already validated by Pydantic model
-            params = []
-            set_clause = []
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        operation = bulk_op.operation.value  # Initialize early to avoid unbound error
+        try:
+            ids = bulk_op.ids
+            payload = bulk_op.payload
+            
+            # Generate secure placeholders for parameterized queries
+            placeholders = ','.join(['?'] * len(ids))
             
-            if payload.per_minute_limit is not None:
-                params.append(payload.per_minute_limit)
-                set_clause.append('per_minute_limit = ?')
-            if payload.per_day_limit is not None:
-                params.append(payload.per_day_limit)
-                set_clause.append('per_day_limit = ?')
-            if payload.per_month_limit is not None:
-                params.append(payload.per_month_limit)
-                set_clause.append('per_month_limit = ?')
+            if operation == "delete":
+                cursor.execute(f'DELETE FROM api_keys WHERE id IN ({placeholders})', ids)
+            elif operation == "activate":
+                cursor.execute(f'UPDATE api_keys SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
+            elif operation == "deactivate":
+                cursor.execute(f'UPDATE api_keys SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
+            elif operation == "update_limits" and payload is not None:
+                # Payload is already validated by Pydantic model
+                params = []
+                set_clause = []
+                
+                if payload.per_minute_limit is not None:
+                    params.append(payload.per_minute_limit)
+                    set_clause.append('per_minute_limit = ?')
+                if payload.per_day_limit is not None:
+                    params.append(payload.per_day_limit)
+                    set_clause.append('per_day_limit = ?')
+                if payload.per_month_limit is not None:
+                    params.append(payload.per_month_limit)
+                    set_clause.append('per_month_limit = ?')
+                
+                if set_clause:
+                    set_clause.append('updated_at = CURRENT_TIMESTAMP')
+                    params.extend(ids)
+                    cursor.execute(f'UPDATE api_keys SET {", ".join(set_clause)} WHERE id IN ({placeholders})', params)
             
-            if set_clause:
-                set_clause.append('updated_at = CURRENT_TIMESTAMP')
-                params.extend(ids)
-                cursor.execute(f'UPDATE api_keys SET {", ".join(set_clause)} WHERE id IN ({placeholders})', params)
+            affected_rows = cursor.rowcount
+            conn.commit()
+            # Bulk operations address keys by id, so drop every cached key
+            API_KEY_CACHE.clear()
+            return {"success": True, "affected_rows": affected_rows, "operation": operation}
         
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
-        return {"success": True, "affected_rows": affected_rows, "operation": operation}
-    
-    except Exception as e:
-        conn.rollback()
-        conn.close()
-        return {"success": False, "error": str(e), "operation": operation}
+        except Exception as e:
+            conn.rollback()
+            return {"success": False, "error": str(e), "operation": operation}
 
 def bulk_update_domains(bulk_op: BulkOperation):
     """Perform bulk operations on domains with secure validation"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
-    operation = bulk_op.operation.value  # Initialize early to avoid unbound error
-    try:
-        ids = bulk_op.ids
-        payload = bulk_op.payload
-        
-        # Generate secure placeholders for parameterized queries
-        placeholders = ','.join(['?'] * len(ids))
-        
-        if operation == "delete":
-            cursor.execute(f'DELETE FROM authorized_domains WHERE id IN ({placeholders})', ids)
-        elif operation == "activate":
-            cursor.execute(f'UPDATE authorized_domains SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
-        elif operation == "deactivate":
-            cursor.execute(f'UPDATE authorized_domains SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
-        elif operation == "update_limits" and payload is not None:
-            # Payload is already validated by Pydantic model
-            params = []
-            set_clause = []
+    with db_manager.get_connection() as conn:
+        cursor = conn.cursor()
+        
+        operation = bulk_op.operation.value  # Initialize early to avoid unbound error
+        try:
+            ids = bulk_op.ids
+            payload = bulk_op.payload
             
-            if payload.per_minute_limit is not None:
-                params.append(payload.per_minute_limit)
-                set_clause.append('per_minute_limit = ?')
-            if payload.per_day_limit is not None:
-                params.append(payload.per_day_limit)
-                set_clause.append('per_day_limit = ?')
-            if payload.per_month_limit is not None:
-                params.append(payload.per_month_limit)
-                set_clause.append('per_month_limit = ?')
+            # Generate secure placeholders for parameterized queries
+            placeholders = ','.join(['?'] * len(ids))
             
-            if set_clause:
-                set_clause.append('updated_at = CURRENT_TIMESTAMP')
-                params.extend(ids)
-                cursor.execute(f'UPDATE authorized_domains SET {", ".join(set_clause)} WHERE id IN ({placeholders})', params)
+            if operation == "delete":
+                cursor.execute(f'DELETE FROM authorized_domains WHERE id IN ({placeholders})', ids)
+            elif operation == "activate":
+                cursor.execute(f'UPDATE authorized_domains SET is_active = TRUE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
+            elif operation == "deactivate":
+                cursor.execute(f'UPDATE authorized_domains SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})', ids)
+            elif operation == "update_limits" and payload is not None:
+                # Payload is already validated by Pydantic model
+                params = []
+                set_clause = []
+                
+                if payload.per_minute_limit is not None:
+                    params.append(payload.per_minute_limit)
+                    set_clause.append('per_minute_limit = ?')
+                if payload.per_day_limit is not None:
+                    params.append(payload.per_day_limit)
+                    set_clause.append('per_day_limit = ?')
+                if payload.per_month_limit is not None:
+                    params.append(payload.per_month_limit)
+                    set_clause.append('per_month_limit = ?')
+                
+                if set_clause:
+                    set_clause.append('updated_at = CURRENT_TIMESTAMP')
+                    params.extend(ids)
+                    cursor.execute(f'UPDATE authorized_domains SET {", ".join(set_clause)} WHERE id IN ({placeholders})', params)
+            
+            affected_rows = cursor.rowcount
+            conn.commit()
+            DOMAIN_CACHE.clear()
+            return {"success": True, "affected_rows": affected_rows, "operation": operation}
         
-        affected_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
-        return {"success": True, "affected_rows": affected_rows, "operation": operation}
-    
-    except Exception as e:
-        conn.rollback()
-        conn.close()
-        return {"success": False, "error": str(e), "operation": operation}
+        except Exception as e:
+            conn.rollback()
+            return {"success": False, "error": str(e), "operation": operation}
 
 def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify API key if provided"""
@@ -2067,90 +2598,63 @@ def verify_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)
         # Hash the provided API key to check against database
         key_hash = hashlib.sha256(api_key.encode()).hexdigest()
         
-        # Check if the key exists in the database
-        conn = sqlite3.connect('astrology_db.sqlite3')
-        cursor = conn.cursor()
-        cursor.execute('SELECT key_hash FROM api_keys WHERE key_hash = ? AND is_active = 1', (key_hash,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
+        # Check if the key exists and is active (served from the API key cache when warm)
+        key_limits = get_api_key_limits(key_hash)
+        if key_limits and key_limits['is_active']:
             return api_key
     return None
 
-def cleanup_expired_sessions():
-    """Remove expired sessions"""
-    now = datetime.now()
-    expired_tokens = []
-    
-    for token, session_data in ACTIVE_SESSIONS.items():
-        session_age = (now - session_data['created_at']).total_seconds()
-        if session_age > SESSION_TIMEOUT:
-            expired_tokens.append(token)
-    
-    for token in expired_tokens:
-        del ACTIVE_SESSIONS[token]
-    
-    return len(expired_tokens)
+# bcrypt hash (default cost) of a discarded random secret. Logins for unknown usernames
+# are checked against it so they take as long as a wrong password for a real admin.
+DUMMY_PASSWORD_HASH = '$2b$12$JVwindoxEb.QArrj84zegOV8irwaMNbrjy.VRP40ju6pjkgbXiPWa'
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash using bcrypt"""
     try:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        # bcrypt is deliberately slow and releases the GIL, so check on a worker thread
+        # instead of stalling every other request on the event loop
+        return await asyncio.to_thread(
+            bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8')
+        )
     except Exception:
         return False
 
 def check_domain_authorization(request: Request):
     """Check if request comes from authorized domain with stricter validation"""
-    # Clean up any expired sessions first
-    cleanup_expired_sessions()
-    
-    host = request.headers.get('host', '').split(':')[0].lower()
+    host = request.headers.get('host', '').partition(':')[0].lower()
     origin = request.headers.get('origin', '')
     referer = request.headers.get('referer', '')
     
     # Get all authorized domains (both in-memory and database)
-    all_authorized_domains = set(AUTHORIZED_DOMAINS)  # Start with in-memory domains
-    db_domains = get_authorized_domains()  # Get domains from database
-    for db_domain in db_domains:
-        all_authorized_domains.add(db_domain['domain'])
-    
-    # Check direct host with exact match
-    if host in all_authorized_domains:
-        return True
-    
-    # Check if host ends with any authorized domain (for subdomains)
-    for domain in all_authorized_domains:
-        if host.endswith('.' + domain) or host == domain:
-            return True
+    all_authorized_domains = DOMAIN_CACHE.get('active')
+    if all_authorized_domains is TTLCache.MISSING:
+        # In-memory domains plus the active ones from the database
+        all_authorized_domains = frozenset(AUTHORIZED_DOMAINS).union(
+            db_domain['domain'] for db_domain in get_authorized_domains()
+        )
+        DOMAIN_CACHE['active'] = all_authorized_domains
     
-    # Check origin with stricter validation
-    if origin:
-        try:
-            from urllib.parse import urlparse
-            origin_host = urlparse(origin).hostname
-            if origin_host and origin_host.lower() in all_authorized_domains:
+    def is_authorized_host(candidate: Optional[str]) -> bool:
+        # The host or any parent domain (a.b.example.com, b.example.com, example.com, com):
+        # one set lookup per label, however many domains are authorized
+        while candidate:
+            if candidate in all_authorized_domains:
                 return True
-            # Check subdomains for origin
-            for domain in all_authorized_domains:
-                if origin_host and (origin_host.endswith('.' + domain) or origin_host == domain):
-                    return True
-        except Exception:
-            pass
+            candidate = candidate.partition('.')[2]
+        return False
     
-    # Check referer with stricter validation
-    if referer:
-        try:
-            from urllib.parse import urlparse
-            referer_host = urlparse(referer).hostname
-            if referer_host and referer_host.lower() in all_authorized_domains:
-                return True
-            # Check subdomains for referer
-            for domain in all_authorized_domains:
-                if referer_host and (referer_host.endswith('.' + domain) or referer_host == domain):
+    # Check direct host, including subdomains
+    if is_authorized_host(host):
+        return True
+    
+    # Check origin and referer with stricter validation (urlparse lowercases hostname)
+    for header_value in (origin, referer):
+        if header_value:
+            try:
+                if is_authorized_host(urlparse(header_value).hostname):
                     return True
-        except Exception:
-            pass
+            except Exception:
+                pass
     
     return False
 
@@ -2261,13 +2765,22 @@ def verify_access(request: Request, api_key: str = Depends(verify_api_key)):
     log_diagnostic(request, 'allowed', 'SUCCESS', **diagnostic_info)
     return True
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main frontend interface"""
+@lru_cache(maxsize=None)
+def read_static_page(path: str) -> Optional[bytes]:
+    """Read a frontend page once per process; None if it is not shipped"""
     try:
-        with open('static/index.html', 'r') as f:
+        with open(path, 'rb') as f:
             return f.read()
     except FileNotFoundError:
+        return None
+
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Serve the main frontend interface"""
+    page = read_static_page('static/index.html')
+    if page is not None:
+        return HTMLResponse(page)
+    else:
         return """
         <!DOCTYPE html>
         <html>
@@ -2292,10 +2805,10 @@ async def root():
 @app.get("/admin", response_class=HTMLResponse)
 async def admin_page():
     """Serve the admin login page"""
-    try:
-        with open('static/admin.html', 'r') as f:
-            return f.read()
-    except FileNotFoundError:
+    page = read_static_page('static/admin.html')
+    if page is not None:
+        return HTMLResponse(page)
+    else:
         return """
         <!DOCTYPE html>
         <html>
@@ -2617,13 +3130,13 @@ async def admin_page():
 async def calculate_chart_get(
     request: Request,
     year: int,
-    month: int, 
-    day: int,
-    hour: int,
-    lat: float,
-    lon: float,
-    minute: int = 0,
-    second: int = 0,
+    month: int = Query(..., ge=1, le=12),
+    day: int = Query(..., ge=1, le=31),
+    hour: int = Query(..., ge=0, le=23),
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    minute: int = Query(0, ge=0, le=59),
+    second: int = Query(0, ge=0, le=59),
     tz: Optional[str] = None,
     ayanamsha: str = 'jn_bhasin',
     house_system: str = 'equal',
@@ -2647,7 +3160,7 @@ async def calculate_chart_get(
         year, month, day, hour, minute, second,
         lat, lon, auto_tz, natal_ayan, natal_house, transit_ayan, transit_house
     )
-    return JSONResponse(content=result)
+    return OrjsonResponse(content=result)
 
 @app.post("/chart")
 async def calculate_chart_post(
@@ -2677,9 +3190,57 @@ async def calculate_chart_post(
         chart_data.lat, chart_data.lon, 
         auto_tz, natal_ayan, natal_house, transit_ayan, transit_house
     )
-    return JSONResponse(content=result)
+    return OrjsonResponse(content=result)
+
+# Swiss Ephemeris keeps the sidereal mode as global state, so mode changes and the
+# calculations that depend on them must not interleave across threads
+SWE_LOCK = threading.Lock()
+
+# Entries per ephemeris cache; each holds a few floats keyed by instant and settings
+EPHEMERIS_CACHE_SIZE = 10_000
+
+@lru_cache(maxsize=EPHEMERIS_CACHE_SIZE)
+def sidereal_planet_positions(julian_day_ut: float, sid_mode: int):
+    """
+    Ayanamsha value and rounded sidereal longitudes for an instant.
+    
+    Returns (ayanamsha_value, degrees, full_precision) where the two tuples follow
+    CHART_PLANET_NAMES, i.e. PLANETS order with Ketu appended.
+    """
+    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
+    longitudes = []
+    # Local bindings for the per-planet loop (fast locals instead of global/attribute lookups)
+    calc_ut = swe.calc_ut
+    append = longitudes.append
+    with SWE_LOCK:
+        swe.set_sid_mode(sid_mode)
+        ayanamsha_value = swe.get_ayanamsa_ut(julian_day_ut)
+        for planet_name, planet_id in PLANET_IDS:
+            try:
+                # Calculate sidereal position using explicit Swiss Ephemeris and sidereal flags
+                position, retflag = calc_ut(julian_day_ut, planet_id, flags)
+                append(position[0])  # Longitude is the first element
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error calculating {planet_name}: {str(e)}")
+    
+    # Ketu is always opposite Rahu (taken from Rahu's 6-place value, as before)
+    longitudes.append((round(longitudes[RAHU_INDEX], 6) + 180) % 360)
+    # Round each raw longitude once per precision; rounding the 6-place value to 2 places
+    # can differ from rounding the raw value
+    degrees = tuple(round(longitude, 2) for longitude in longitudes)
+    full_precision = tuple(round(longitude, 6) for longitude in longitudes)
+    return ayanamsha_value, degrees, full_precision
+
+@lru_cache(maxsize=EPHEMERIS_CACHE_SIZE)
+def sidereal_houses(julian_day_ut: float, lat: float, lon: float, house_system_code: bytes, sid_mode: int):
+    """Sidereal house cusps (first 12) and Ascendant for an instant and location"""
+    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
+    with SWE_LOCK:
+        swe.set_sid_mode(sid_mode)
+        houses, ascmc = swe.houses_ex(julian_day_ut, lat, lon, house_system_code, flags)
+    return tuple(houses[:12]), ascmc[0]  # Ascendant is the first element in ascmc
 
-async def calculate_chart_internal(
+def compute_chart(
     year: int,
     month: int, 
     day: int,
@@ -2703,99 +3264,84 @@ async def calculate_chart_internal(
     - lat: Latitude in degrees (positive for North)
     - lon: Longitude in degrees (positive for East)
     
-    Returns JSON with julian_day_ut, ascendant_deg, and planets_deg dictionary.
+    Returns a dict with julian_day_ut, ascendant_deg, and planets_deg dictionary;
+    callers compose it into their own response and serialize once.
     """
-    try:
-        # Validate inputs
-        if not (1 <= month <= 12):
-            raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
-        if not (1 <= day <= 31):
-            raise HTTPException(status_code=400, detail="Day must be between 1 and 31")
-        if not (0 <= hour <= 23):
-            raise HTTPException(status_code=400, detail="Hour must be between 0 and 23")
-        if not (0 <= minute <= 59):
-            raise HTTPException(status_code=400, detail="Minute must be between 0 and 59")
-        if not (0 <= second <= 59):
-            raise HTTPException(status_code=400, detail="Second must be between 0 and 59")
-        if not (-90 <= lat <= 90):
-            raise HTTPException(status_code=400, detail="Latitude must be between -90 and 90 degrees")
-        if not (-180 <= lon <= 180):
-            raise HTTPException(status_code=400, detail="Longitude must be between -180 and 180 degrees")
-        
-        # Validate ayanamsha
-        if ayanamsha not in AYANAMSHA_OPTIONS:
-            raise HTTPException(status_code=400, detail=f"Invalid ayanamsha. Must be one of: {list(AYANAMSHA_OPTIONS.keys())}")
-        
-        # Validate house system
-        if house_system not in HOUSE_SYSTEMS:
-            raise HTTPException(status_code=400, detail=f"Invalid house system. Must be one of: {list(HOUSE_SYSTEMS.keys())}")
-        
-        # Convert local time to UT using timezone
-        hour_ut = convert_timezone_to_ut(year, month, day, hour, minute, second, tz)
-        
-        # Convert to Julian Day using UT time
-        julian_day_ut = swe.julday(year, month, day, hour_ut)
-        
-        # Set the ayanamsha
-        ayanamsha_info = AYANAMSHA_OPTIONS[ayanamsha]
-        swe.set_sid_mode(ayanamsha_info['id'])
-        
-        # Get ayanamsha value for the given date
-        ayanamsha_value = swe.get_ayanamsa_ut(julian_day_ut)
-        
-        # Calculate houses and Ascendant using selected house system in sidereal mode
-        # Using sidereal flag for Vedic astrology  
-        flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
-        house_system_code = HOUSE_SYSTEMS[house_system].encode('ascii')
-        houses, ascmc = swe.houses_ex(julian_day_ut, lat, lon, house_system_code, flags)
-        ascendant_deg = round(ascmc[0], 2)  # Ascendant is the first element in ascmc
-        
-        # Prepare house cusps with full precision
-        house_cusps = [round(house, 6) for house in houses[:12]]  # Only need first 12 houses
-        
-        # Calculate planetary positions with full precision
-        planets_deg = {}
-        planets_full_precision = {}
-        
-        for planet_name, planet_id in PLANETS.items():
-            try:
-                # Calculate sidereal position using explicit Swiss Ephemeris and sidereal flags
-                flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
-                position, retflag = swe.calc_ut(julian_day_ut, planet_id, flags)
-                longitude = position[0]  # Longitude is the first element
-                planets_deg[planet_name] = round(longitude, 2)
-                planets_full_precision[planet_name] = round(longitude, 6)
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Error calculating {planet_name}: {str(e)}")
-        
-        # Calculate Ketu (Rahu + 180 degrees)
-        rahu_longitude = planets_full_precision['Rahu']
-        ketu_longitude = (rahu_longitude + 180) % 360
-        planets_deg['Ketu'] = round(ketu_longitude, 2)
-        planets_full_precision['Ketu'] = round(ketu_longitude, 6)
-        
-        # Prepare enhanced response with all frontend-expected fields
-        ascendant_full_precision = round(ascmc[0], 6)
-        
-        return JSONResponse(content={
-            "julian_day_ut": round(julian_day_ut, 6),
-            "ascendant_deg": ascendant_deg,
-            "ascendant_full_precision": ascendant_full_precision,
-            "planets_deg": planets_deg,
-            "planets_full_precision": planets_full_precision,
-            "house_cusps": house_cusps,
-            "house_system_used": HOUSE_SYSTEM_NAMES[house_system],
-            "ayanamsha_name": ayanamsha_info['name'],
-            "ayanamsha_value_decimal": round(ayanamsha_value, 6),
-            "ayanamsha_value_dms": decimal_to_dms(ayanamsha_value),
-            "timezone_used": tz,
-            "input_time_ut": round(hour_ut, 6)
-        })
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    # Date/time and coordinate ranges are enforced once by the /chart Query
+    # constraints and ChartRequest fields before we get here
+    
+    # Validate ayanamsha
+    if ayanamsha not in AYANAMSHA_OPTIONS:
+        raise HTTPException(status_code=400, detail=INVALID_AYANAMSHA_DETAIL)
+    
+    # Validate house system
+    if house_system not in HOUSE_SYSTEMS:
+        raise HTTPException(status_code=400, detail=INVALID_HOUSE_SYSTEM_DETAIL)
+    
+    # Convert local time to UT using timezone
+    hour_ut = convert_timezone_to_ut(year, month, day, hour, minute, second, tz)
+    
+    # Convert to Julian Day using UT time
+    julian_day_ut = swe.julday(year, month, day, hour_ut)
+    
+    # Ayanamsha value and planet positions for the selected ayanamsha (cached per instant)
+    sid_mode = AYANAMSHA_IDS[ayanamsha]
+    ayanamsha_value, degrees, full_precision = sidereal_planet_positions(julian_day_ut, sid_mode)
+    
+    # Calculate houses and Ascendant using selected house system in sidereal mode
+    houses, ascendant = sidereal_houses(julian_day_ut, lat, lon, HOUSE_SYSTEM_CODES[house_system], sid_mode)
+    ascendant_deg = round(ascendant, 2)
+    
+    # Prepare house cusps with full precision
+    house_cusps = [round(house, 6) for house in houses]
+    
+    # Planetary positions, including Ketu, already rounded by the cached helper
+    planets_deg = dict(zip(CHART_PLANET_NAMES, degrees))
+    planets_full_precision = dict(zip(CHART_PLANET_NAMES, full_precision))
+    
+    # Prepare enhanced response with all frontend-expected fields
+    ascendant_full_precision = round(ascendant, 6)
+    
+    return {
+        "julian_day_ut": round(julian_day_ut, 6),
+        "ascendant_deg": ascendant_deg,
+        "ascendant_full_precision": ascendant_full_precision,
+        "planets_deg": planets_deg,
+        "planets_full_precision": planets_full_precision,
+        "house_cusps": house_cusps,
+        "house_system_used": HOUSE_SYSTEM_NAMES[house_system],
+        "ayanamsha_name": AYANAMSHA_NAMES[ayanamsha],
+        "ayanamsha_value_decimal": round(ayanamsha_value, 6),
+        "ayanamsha_value_dms": decimal_to_dms(ayanamsha_value),
+        "timezone_used": tz,
+        "input_time_ut": round(hour_ut, 6)
+    }
+
+# Natal charts depend only on their inputs, so parsed natal results are kept in an LRU.
+# Only touched from the event loop; a rare duplicate computation on a race is harmless.
+NATAL_CHART_CACHE_SIZE = 10_000
+NATAL_CHART_CACHE = OrderedDict()
+
+async def natal_chart_data(
+    year: int, month: int, day: int, hour: int, minute: int, second: int,
+    lat: float, lon: float, tz: str, ayanamsha: str, house_system: str
+) -> dict:
+    """Natal chart data as returned by compute_chart, memoized on its inputs"""
+    key = (year, month, day, hour, minute, second, lat, lon, tz, ayanamsha, house_system)
+    natal_data = NATAL_CHART_CACHE.get(key)
+    if natal_data is not None:
+        NATAL_CHART_CACHE.move_to_end(key)
+        return natal_data
+    
+    natal_data = await asyncio.get_running_loop().run_in_executor(
+        app.state.chart_executor, compute_chart,
+        year, month, day, hour, minute, second,
+        lat, lon, tz, ayanamsha, house_system
+    )
+    NATAL_CHART_CACHE[key] = natal_data
+    if len(NATAL_CHART_CACHE) > NATAL_CHART_CACHE_SIZE:
+        NATAL_CHART_CACHE.popitem(last=False)
+    return natal_data
 
 async def build_natal_transit_response(
     year: int, month: int, day: int, hour: int, minute: int, second: int,
@@ -2804,30 +3350,25 @@ async def build_natal_transit_response(
 ):
     """Build combined natal and transit response"""
     try:
-        # Calculate natal chart with natal-specific ayanamsha and house system
-        natal_result = await calculate_chart_internal(
-            year, month, day, hour, minute, second,
-            lat, lon, tz, natal_ayanamsha, natal_house_system
-        )
-        
-        # Extract natal data from JSONResponse
-        natal_data = json.loads(bytes(natal_result.body).decode())
-        
         # Get current date and time for transit chart in user's timezone
-        user_tz = pytz.timezone(tz)
-        now_utc = datetime.now(pytz.utc)
-        now_local = now_utc.astimezone(user_tz)
-        
-        # Calculate transit chart with transit-specific ayanamsha and house system
-        transit_result = await calculate_chart_internal(
-            now_local.year, now_local.month, now_local.day,
-            now_local.hour, now_local.minute, now_local.second,
-            lat, lon, tz, transit_ayanamsha, transit_house_system
+        # datetime.now(tz) converts from UTC in one step; for 'UTC' it is pytz.utc and costs nothing
+        now_local = datetime.now(get_timezone(tz))
+        
+        # Natal (natal-specific ayanamsha and house system) and transit (transit-specific)
+        # charts are independent, so compute them concurrently on the chart executor
+        natal_data, transit_data = await asyncio.gather(
+            natal_chart_data(
+                year, month, day, hour, minute, second,
+                lat, lon, tz, natal_ayanamsha, natal_house_system
+            ),
+            asyncio.get_running_loop().run_in_executor(
+                app.state.chart_executor, compute_chart,
+                now_local.year, now_local.month, now_local.day,
+                now_local.hour, now_local.minute, now_local.second,
+                lat, lon, tz, transit_ayanamsha, transit_house_system
+            )
         )
         
-        # Extract transit data from JSONResponse
-        transit_data = json.loads(bytes(transit_result.body).decode())
-        
         # Structure the clean response with only fields used by frontend
         response_data = {
             # Frontend display data
@@ -2845,41 +3386,33 @@ async def build_natal_transit_response(
                 "transit_input_time_ut": natal_data["input_time_ut"]  # Use same as natal per user request
             },
             
-            "natal_planets": dict(Ascendant=natal_data["ascendant_full_precision"], **natal_data["planets_full_precision"]),
-            "natal_house_cusps": {f"House {i + 1}": cusp for i, cusp in enumerate(natal_data["house_cusps"])},
-            "transit_planets": dict(Ascendant=transit_data["ascendant_full_precision"], **transit_data["planets_full_precision"]),
-            "transit_house_cusps": {f"House {i + 1}": cusp for i, cusp in enumerate(transit_data["house_cusps"])}
+            "natal_planets": {"Ascendant": natal_data["ascendant_full_precision"], **natal_data["planets_full_precision"]},
+            "natal_house_cusps": dict(zip(HOUSE_CUSP_KEYS, natal_data["house_cusps"])),
+            "transit_planets": {"Ascendant": transit_data["ascendant_full_precision"], **transit_data["planets_full_precision"]},
+            "transit_house_cusps": dict(zip(HOUSE_CUSP_KEYS, transit_data["house_cusps"]))
         }
         
         return response_data
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error calculating natal-transit charts: {str(e)}")
+    except pytz.UnknownTimeZoneError:
+        # Other HTTPExceptions keep their status; unexpected errors reach the app-level handler
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
 
 def verify_admin_session(request: Request):
     """Verify admin session token with timeout validation"""
-    # Clean up expired sessions
-    cleanup_expired_sessions()
-    
     auth_header = request.headers.get('authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
     token = auth_header.split(' ')[1]
-    if token not in ACTIVE_SESSIONS:
+    # Expired sessions are evicted by the store on lookup
+    try:
+        session_data = ACTIVE_SESSIONS[token]
+    except KeyError:
         raise HTTPException(status_code=401, detail="Invalid or expired session")
     
-    session_data = ACTIVE_SESSIONS[token]
-    now = datetime.now()
-    
-    # Check session timeout
-    session_age = (now - session_data['created_at']).total_seconds()
-    if session_age > SESSION_TIMEOUT:
-        del ACTIVE_SESSIONS[token]
-        raise HTTPException(status_code=401, detail="Session expired")
-    
     # Update last activity
-    session_data['last_activity'] = now
+    session_data['last_activity'] = time.monotonic()
     
     return session_data['username']
 
@@ -2887,16 +3420,14 @@ def verify_admin_session(request: Request):
 @app.post("/admin/login")
 async def admin_login(login_data: AdminLogin):
     """Secure admin login endpoint with bcrypt password verification using database"""
-    # Clean up expired sessions first
-    cleanup_expired_sessions()
-    
-    # Rate limiting: simple check to prevent brute force (in production, use proper rate limiting)
-    if len(ACTIVE_SESSIONS) > 10:
-        raise HTTPException(status_code=429, detail="Too many active sessions. Try again later.")
+    # No session-count guard here: ACTIVE_SESSIONS is capped at MAX_ACTIVE_SESSIONS and
+    # signs out the oldest login once full
     
     # Get admin from database
-    admin_user = get_admin_by_username(login_data.username)
-    if admin_user and verify_password(login_data.password, admin_user['password_hash']):
+    admin_user = await run_db(get_admin_by_username, login_data.username)
+    password_hash = admin_user['password_hash'] if admin_user else DUMMY_PASSWORD_HASH
+    password_valid = await verify_password(login_data.password, password_hash)
+    if admin_user and password_valid:
         # Check if password change is required
         must_change_password = admin_user.get('must_change_password', False)
         
@@ -2904,8 +3435,8 @@ async def admin_login(login_data: AdminLogin):
         token = secrets.token_urlsafe(32)
         ACTIVE_SESSIONS[token] = {
             'username': login_data.username,
-            'created_at': datetime.now(),
-            'last_activity': datetime.now(),
+            'created_at': time.monotonic(),
+            'last_activity': time.monotonic(),
             'password_change_required': must_change_password
         }
         
@@ -2922,9 +3453,7 @@ async def admin_login(login_data: AdminLogin):
         
         return response
     else:
-        # Add a small delay to prevent timing attacks
-        import time
-        time.sleep(0.5)
+        # Both failure paths already spent one bcrypt check, so no extra delay is needed
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
 @app.post("/admin/password-change")
@@ -2944,19 +3473,21 @@ async def admin_password_change(password_data: PasswordChangeRequest, username:
         raise HTTPException(status_code=400, detail="New password must contain at least one uppercase letter")
     
     # Get current admin from database
-    admin_user = get_admin_by_username(username)
+    admin_user = await run_db(get_admin_by_username, username)
     if not admin_user:
         raise HTTPException(status_code=401, detail="Admin user not found")
     
     # Verify current password
-    if not verify_password(current_password, admin_user['password_hash']):
+    if not await verify_password(current_password, admin_user['password_hash']):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     # Generate new password hash
-    new_password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    new_password_hash = (await asyncio.to_thread(
+        bcrypt.hashpw, new_password.encode('utf-8'), bcrypt.gensalt()
+    )).decode('utf-8')
     
     # Update password in database and clear change requirement
-    if update_admin_password(username, new_password_hash, clear_change_requirement=True):
+    if await run_db(update_admin_password, username, new_password_hash, clear_change_requirement=True):
         # Update active sessions to remove password change requirement
         for token, session_data in ACTIVE_SESSIONS.items():
             if session_data['username'] == username:
@@ -2972,8 +3503,7 @@ async def admin_logout(request: Request, admin_user: str = Depends(verify_admin_
     auth_header = request.headers.get('authorization')
     if auth_header and auth_header.startswith('Bearer '):
         token = auth_header.split(' ')[1]
-        if token in ACTIVE_SESSIONS:
-            del ACTIVE_SESSIONS[token]
+        ACTIVE_SESSIONS.pop(token)
     
     return {"message": "Logged out successfully"}
 
@@ -2985,9 +3515,20 @@ async def admin_logout_all(request: Request, admin_user: str = Depends(verify_ad
     return {"message": "All sessions terminated successfully"}
 
 @app.get("/admin/api-keys")
-async def get_api_keys(request: Request, admin_user: str = Depends(verify_admin_session)):
-    """Get all API keys from database with limits"""
-    paginated_result = get_api_keys_paginated()
+async def get_api_keys(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, max_length=512),
+    admin_user: str = Depends(verify_admin_session)
+):
+    """Get API keys from database with limits, one page at a time (newest first).
+    
+    Pass the previous response's next_cursor as cursor to fetch the following page
+    without the OFFSET cost of a deep page number.
+    """
+    after = decode_page_cursor(cursor) if cursor else None
+    paginated_result = await run_db(get_api_keys_paginated, page=page, page_size=page_size, after=after)
     
     # Convert array format to object format expected by frontend
     api_keys = {}
@@ -3003,12 +3544,19 @@ async def get_api_keys(request: Request, admin_user: str = Depends(verify_admin_
             'updated_at': key_info['updated_at']
         }
     
-    return {"api_keys": api_keys}
+    return {
+        "api_keys": api_keys,
+        "total": paginated_result['total'],
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": paginated_result['next_cursor']
+    }
 
 @app.post("/admin/api-keys")
 async def create_api_key(request: Request, key_data: CreateAPIKeyRequest, admin_user: str = Depends(verify_admin_session)):
     """Create new API key with rate limits"""
-    result = create_api_key_db(
+    result = await run_db(
+        create_api_key_db,
         name=key_data.name,
         description=key_data.description or '',
         per_minute_limit=key_data.per_minute_limit,
@@ -3023,7 +3571,8 @@ async def create_api_key(request: Request, key_data: CreateAPIKeyRequest, admin_
 @app.put("/admin/api-keys/{api_key_hash}/limits")
 async def update_api_key_limits_endpoint(request: Request, api_key_hash: str, limits_data: UpdateAPIKeyLimitsRequest, admin_user: str = Depends(verify_admin_session)):
     """Update API key rate limits"""
-    success = update_api_key_limits(
+    success = await run_db(
+        update_api_key_limits,
         key_hash=api_key_hash,
         per_minute_limit=limits_data.per_minute_limit,
         per_day_limit=limits_data.per_day_limit,
@@ -3037,22 +3586,39 @@ async def update_api_key_limits_endpoint(request: Request, api_key_hash: str, li
 @app.delete("/admin/api-keys/{api_key_hash}")
 async def delete_api_key(request: Request, api_key_hash: str, admin_user: str = Depends(verify_admin_session)):
     """Delete API key"""
-    success = delete_api_key_db(api_key_hash)
+    success = await run_db(delete_api_key_db, api_key_hash)
     if success:
         return {"message": "API key deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="API key not found")
 
 @app.get("/admin/domains")
-async def get_domains(request: Request, admin_user: str = Depends(verify_admin_session)):
-    """Get authorized domains with limits from database"""
-    domains = get_authorized_domains()
-    return {"domains": domains}
+async def get_domains(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, max_length=512),
+    admin_user: str = Depends(verify_admin_session)
+):
+    """Get authorized domains with limits from database, one page at a time (newest first).
+    
+    Pass the previous response's next_cursor as cursor to continue from there.
+    """
+    after = decode_page_cursor(cursor) if cursor else None
+    result = await run_db(get_authorized_domains_paginated, page=page, page_size=page_size, after=after)
+    return {
+        "domains": result['domains'],
+        "total": result['total'],
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": result['next_cursor']
+    }
 
 @app.post("/admin/domains")
 async def add_domain(request: Request, domain_data: CreateDomainRequest, admin_user: str = Depends(verify_admin_session)):
     """Add authorized domain with rate limits"""
-    success = add_authorized_domain(
+    success = await run_db(
+        add_authorized_domain,
         domain=domain_data.domain,
         per_minute_limit=domain_data.per_minute_limit,
         per_day_limit=domain_data.per_day_limit,
@@ -3066,18 +3632,23 @@ async def add_domain(request: Request, domain_data: CreateDomainRequest, admin_u
 # V1 Admin API Endpoints - Secure and scalable
 @app.get("/admin/v1/api-keys", response_model=PaginatedResponse)
 async def get_api_keys_v1_endpoint(
-    pagination: APIKeyPaginationParams = Depends(),
+    page: int = Query(1, ge=1, le=10000),
+    page_size: int = Query(25, ge=1, le=1000),
+    search: str = Query("", max_length=255),
+    sort_by: APIKeySortField = APIKeySortField.created_at,
+    sort_order: SortOrder = SortOrder.desc,
     filters: APIKeyFilters = Depends(),
     admin_user: str = Depends(verify_admin_session)
 ):
     """Enhanced API keys retrieval with pagination, search, filtering and sorting"""
     try:
-        result = get_api_keys_v1(
-            page=pagination.page,
-            page_size=pagination.page_size,
-            search=pagination.search or "",
-            sort_by=pagination.sort_by,
-            sort_order=pagination.sort_order,
+        result = await run_db(
+            get_api_keys_v1,
+            page=page,
+            page_size=page_size,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
             is_active=filters.is_active,
             created_after=filters.created_after,
             created_before=filters.created_before
@@ -3093,7 +3664,8 @@ async def create_api_key_v1(
 ):
     """Create new API key with enhanced validation"""
     try:
-        result = create_api_key_db(
+        result = await run_db(
+            create_api_key_db,
             name=key_data.name,
             description=key_data.description or '',
             per_minute_limit=key_data.per_minute_limit,
@@ -3114,7 +3686,7 @@ async def bulk_api_keys_v1(
 ):
     """Perform bulk operations on API keys"""
     try:
-        result = bulk_update_api_keys(operation)
+        result = await run_db(bulk_update_api_keys, operation)
         if result["success"]:
             return {
                 "message": f"Bulk operation completed successfully", 
@@ -3127,18 +3699,23 @@ async def bulk_api_keys_v1(
 
 @app.get("/admin/v1/domains", response_model=PaginatedResponse)
 async def get_domains_v1_endpoint(
-    pagination: DomainPaginationParams = Depends(),
+    page: int = Query(1, ge=1, le=10000),
+    page_size: int = Query(25, ge=1, le=1000),
+    search: str = Query("", max_length=255),
+    sort_by: DomainSortField = DomainSortField.created_at,
+    sort_order: SortOrder = SortOrder.desc,
     filters: DomainFilters = Depends(),
     admin_user: str = Depends(verify_admin_session)
 ):
     """Enhanced domains retrieval with pagination, search, filtering and sorting"""
     try:
-        result = get_domains_v1(
-            page=pagination.page,
-            page_size=pagination.page_size,
-            search=pagination.search or "",
-            sort_by=pagination.sort_by,
-            sort_order=pagination.sort_order,
+        result = await run_db(
+            get_domains_v1,
+            page=page,
+            page_size=page_size,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
             is_active=filters.is_active,
             created_after=filters.created_after,
             created_before=filters.created_before
@@ -3154,7 +3731,8 @@ async def create_domain_v1(
 ):
     """Create new authorized domain with enhanced validation"""
     try:
-        success = add_authorized_domain(
+        success = await run_db(
+            add_authorized_domain,
             domain=domain_data.domain,
             per_minute_limit=domain_data.per_minute_limit,
             per_day_limit=domain_data.per_day_limit,
@@ -3174,7 +3752,7 @@ async def bulk_domains_v1(
 ):
     """Perform bulk operations on domains"""
     try:
-        result = bulk_update_domains(operation)
+        result = await run_db(bulk_update_domains, operation)
         if result["success"]:
             return {
                 "message": f"Bulk operation completed successfully", 
@@ -3188,17 +3766,13 @@ async def bulk_domains_v1(
 @app.put("/admin/domains/{domain}/limits")
 async def update_domain_limits_endpoint(request: Request, domain: str, limits_data: UpdateDomainLimitsRequest, admin_user: str = Depends(verify_admin_session)):
     """Update domain rate limits"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE authorized_domains 
-        SET per_minute_limit = ?, per_day_limit = ?, per_month_limit = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE domain = ?
-    ''', (limits_data.per_minute_limit, limits_data.per_day_limit, limits_data.per_month_limit, domain))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    
+    success = await run_db(
+        update_domain_limits,
+        domain=domain,
+        per_minute_limit=limits_data.per_minute_limit,
+        per_day_limit=limits_data.per_day_limit,
+        per_month_limit=limits_data.per_month_limit
+    )
     if success:
         return {"message": f"Domain {domain} limits updated successfully"}
     else:
@@ -3207,7 +3781,7 @@ async def update_domain_limits_endpoint(request: Request, domain: str, limits_da
 @app.delete("/admin/domains/{domain}")
 async def delete_domain(request: Request, domain: str, admin_user: str = Depends(verify_admin_session)):
     """Remove authorized domain"""
-    success = delete_authorized_domain(domain)
+    success = await run_db(delete_authorized_domain, domain)
     if success:
         return {"message": f"Domain {domain} removed successfully"}
     else:
@@ -3245,9 +3819,12 @@ async def get_analytics_dashboard(
         raise HTTPException(status_code=400, detail="view_type must be 'all', 'api_key', or 'domain'")
     
     try:
-        analytics = get_usage_analytics(days, view_type, identifier, period)
-        summary = get_usage_summary()
-        violations = get_rate_limit_violations()
+        # Independent read-only queries; WAL lets them run side by side on the DB executor
+        analytics, summary, violations = await asyncio.gather(
+            run_db(get_usage_analytics, days, view_type, identifier, period),
+            run_db(get_usage_summary),
+            run_db(get_rate_limit_violations)
+        )
         
         return {
             "analytics": analytics,
@@ -3265,7 +3842,7 @@ async def get_analytics_dashboard(
 async def get_analytics_summary(admin_user: str = Depends(verify_admin_session)):
     """Get quick summary statistics for dashboard KPIs"""
     try:
-        return get_usage_summary()
+        return await run_db(get_usage_summary)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load summary: {str(e)}")
 
@@ -3276,7 +3853,7 @@ async def get_usage_data(days: int, admin_user: str = Depends(verify_admin_sessi
         raise HTTPException(status_code=400, detail="Days must be between 1 and 365")
     
     try:
-        return get_usage_analytics(days)
+        return await run_db(get_usage_analytics, days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load usage data: {str(e)}")
 
@@ -3284,69 +3861,24 @@ async def get_usage_data(days: int, admin_user: str = Depends(verify_admin_sessi
 async def get_violations_data(admin_user: str = Depends(verify_admin_session)):
     """Get recent rate limit violations"""
     try:
-        return get_rate_limit_violations()
+        return await run_db(get_rate_limit_violations)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load violations: {str(e)}")
 
 @app.get("/admin/analytics/api-keys")
 async def get_analytics_api_keys(admin_user: str = Depends(verify_admin_session)):
     """Get list of API keys for analytics dropdown"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            SELECT key_hash, name, description, is_active
-            FROM api_keys 
-            WHERE is_active = 1
-            ORDER BY name
-        ''')
-        
-        api_keys = []
-        for row in cursor.fetchall():
-            key_hash, name, description, is_active = row
-            api_keys.append({
-                'key_hash': key_hash,
-                'name': name,
-                'description': description or 'No description',
-                'is_active': bool(is_active)
-            })
-        
-        conn.close()
-        return {"api_keys": api_keys}
-        
+        return {"api_keys": await run_db(get_analytics_api_key_options)}
     except Exception as e:
-        conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to load API keys: {str(e)}")
 
 @app.get("/admin/analytics/domains")
 async def get_analytics_domains(admin_user: str = Depends(verify_admin_session)):
     """Get list of domains for analytics dropdown"""
-    conn = sqlite3.connect('astrology_db.sqlite3')
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            SELECT domain, description, is_active
-            FROM authorized_domains 
-            WHERE is_active = 1
-            ORDER BY domain
-        ''')
-        
-        domains = []
-        for row in cursor.fetchall():
-            domain, description, is_active = row
-            domains.append({
-                'domain': domain,
-                'description': description or 'No description',
-                'is_active': bool(is_active)
-            })
-        
-        conn.close()
-        return {"domains": domains}
-        
+        return {"domains": await run_db(get_analytics_domain_options)}
     except Exception as e:
-        conn.close()
         raise HTTPException(status_code=500, detail=f"Failed to load domains: {str(e)}")
 
 # Diagnostic Admin Endpoints
@@ -3355,11 +3887,11 @@ async def get_diagnostic_status(admin_user: str = Depends(verify_admin_session))
     """Get current diagnostic and bypass status"""
     try:
         return DiagnosticStatusResponse(
-            api_key_enforcement_enabled=get_setting_bool('api_key_enforcement_enabled', True),
-            bypass_enabled=get_setting_bool('diag_bypass_enabled', False),
-            bypass_expires_at=get_setting('diag_bypass_expires_at', ''),
-            bypass_allowed_ips=get_setting('diag_bypass_allowed_ips', ''),
-            diagnostic_mode=get_setting_bool('diag_mode', False),
+            api_key_enforcement_enabled=await run_db(get_setting_bool, 'api_key_enforcement_enabled', True),
+            bypass_enabled=await run_db(get_setting_bool, 'diag_bypass_enabled', False),
+            bypass_expires_at=await run_db(get_setting, 'diag_bypass_expires_at', ''),
+            bypass_allowed_ips=await run_db(get_setting, 'diag_bypass_allowed_ips', ''),
+            diagnostic_mode=await run_db(get_setting_bool, 'diag_mode', False),
             environment=os.getenv('ENVIRONMENT', 'development')
         )
     except Exception as e:
@@ -3400,7 +3932,7 @@ async def toggle_api_key_enforcement(
             validated_ips_str = ''
         
         # Update API key enforcement setting
-        update_setting('api_key_enforcement_enabled', str(toggle_request.enabled).lower())
+        await run_db(update_setting, 'api_key_enforcement_enabled', str(toggle_request.enabled).lower())
         
         # If disabling enforcement, set up time-limited bypass with IP restrictions
         if not toggle_request.enabled:
@@ -3408,13 +3940,13 @@ async def toggle_api_key_enforcement(
             duration = toggle_request.duration_minutes or 30  # Fallback to 30 minutes
             # Use UTC time for consistent timezone handling
             expires_at = datetime.utcnow() + timedelta(minutes=duration)
-            update_setting('diag_bypass_enabled', 'true')
-            update_setting('diag_bypass_expires_at', expires_at.isoformat())
+            await run_db(update_setting, 'diag_bypass_enabled', 'true')
+            await run_db(update_setting, 'diag_bypass_expires_at', expires_at.isoformat())
             # Require at least one IP for bypass (empty means no access allowed)
             if not validated_ips_str:
                 client_ip = get_client_ip(request)
                 validated_ips_str = client_ip  # Default to current admin IP
-            update_setting('diag_bypass_allowed_ips', validated_ips_str)
+            await run_db(update_setting, 'diag_bypass_allowed_ips', validated_ips_str)
             
             return {
                 "message": f"API key enforcement disabled for {duration} minutes",
@@ -3425,9 +3957,9 @@ async def toggle_api_key_enforcement(
             }
         else:
             # If enabling enforcement, clear bypass settings
-            update_setting('diag_bypass_enabled', 'false')
-            update_setting('diag_bypass_expires_at', '')
-            update_setting('diag_bypass_allowed_ips', '')
+            await run_db(update_setting, 'diag_bypass_enabled', 'false')
+            await run_db(update_setting, 'diag_bypass_expires_at', '')
+            await run_db(update_setting, 'diag_bypass_allowed_ips', '')
             
             return {
                 "message": "API key enforcement enabled successfully",
@@ -3449,7 +3981,7 @@ async def run_diagnostic_test(
         if test_request.test_type == "api_key" and test_request.api_key:
             # Test API key validation
             key_hash = hashlib.sha256(test_request.api_key.encode()).hexdigest()
-            key_limits = get_api_key_limits(key_hash)
+            key_limits = await run_db(get_api_key_limits, key_hash)
             
             results.append({
                 "test": "API Key Existence",
@@ -3472,8 +4004,8 @@ async def run_diagnostic_test(
         
         elif test_request.test_type == "bypass":
             # Test bypass conditions
-            enforcement_enabled = get_setting_bool('api_key_enforcement_enabled', True)
-            bypass_enabled = get_setting_bool('diag_bypass_enabled', False)
+            enforcement_enabled = await run_db(get_setting_bool, 'api_key_enforcement_enabled', True)
+            bypass_enabled = await run_db(get_setting_bool, 'diag_bypass_enabled', False)
             
             results.append({
                 "test": "API Key Enforcement",
@@ -3488,7 +4020,7 @@ async def run_diagnostic_test(
             })
             
             if bypass_enabled:
-                expires_at = get_setting('diag_bypass_expires_at', '')
+                expires_at = await run_db(get_setting, 'diag_bypass_expires_at', '')
                 if expires_at:
                     try:
                         expire_time = datetime.fromisoformat(expires_at)
@@ -3536,79 +4068,45 @@ async def get_diagnostic_logs(
     admin_user: str = Depends(verify_admin_session)
 ):
     """Get diagnostic logs with pagination and filtering"""
-    conn = None
-    try:
-        conn = sqlite3.connect('astrology_db.sqlite3')
-        cursor = conn.cursor()
-        
-        # Build WHERE clause for filtering
-        where_conditions = []
-        params = []
-        
-        if outcome:
-            where_conditions.append('outcome = ?')
-            params.append(outcome)
-            
-        if client_ip:
-            where_conditions.append('client_ip = ?')
-            params.append(client_ip)
-        
-        where_clause = 'WHERE ' + ' AND '.join(where_conditions) if where_conditions else ''
-        
-        # Get total count
-        count_query = f'SELECT COUNT(*) FROM api_diagnostics {where_clause}'
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()[0]
-        
-        # Get paginated results
-        offset = (page - 1) * page_size
-        query = f'''
-            SELECT id, ts, request_id, path, client_ip, origin, user_agent, auth_scheme,
-                   auth_present, key_hash_prefix, key_active, key_exists, domain, outcome,
-                   reason_code, rl_minute, rl_day, rl_month, rl_minute_limit, 
-                   rl_day_limit, rl_month_limit
-            FROM api_diagnostics
-            {where_clause}
-            ORDER BY ts DESC
-            LIMIT ? OFFSET ?
-        '''
-        cursor.execute(query, params + [page_size, offset])
-        
-        logs = []
-        for row in cursor.fetchall():
-            logs.append(DiagnosticLogEntry(
-                id=row[0], ts=row[1], request_id=row[2], path=row[3],
-                client_ip=row[4], origin=row[5], user_agent=row[6], 
-                auth_scheme=row[7], auth_present=bool(row[8]), key_hash_prefix=row[9],
-                key_active=row[10], key_exists=row[11], domain=row[12], 
-                outcome=row[13], reason_code=row[14], rl_minute=row[15],
-                rl_day=row[16], rl_month=row[17], rl_minute_limit=row[18],
-                rl_day_limit=row[19], rl_month_limit=row[20]
-            ))
-        
-        conn.close()
-        
-        return DiagnosticLogsResponse(
-            logs=logs,
-            total=total,
-            page=page,
-            page_size=page_size
-        )
-        
-    except Exception as e:
-        if conn:
-            conn.close()
-        raise HTTPException(status_code=500, detail=f"Failed to get diagnostic logs: {str(e)}")
+    # sqlite3 blocks, so run the queries on the DB executor instead of the event loop
+    loop = asyncio.get_running_loop()
+    total, rows = await loop.run_in_executor(
+        app.state.db_executor, fetch_diagnostic_logs, page, page_size, outcome, client_ip
+    )
+    
+    # Returning the response directly bypasses response_model re-validation;
+    # the model is still used for the OpenAPI schema
+    return StreamingResponse(
+        stream_diagnostic_logs(rows, total, page, page_size),
+        media_type="application/json"
+    )
 
 @app.get("/ayanamsha-options")
-async def get_ayanamsha_options():
+async def get_ayanamsha_options(request: Request):
     """Get available ayanamsha options"""
-    return {"options": AYANAMSHA_OPTIONS}
+    cache_headers = {"Cache-Control": "public, max-age=86400", "ETag": AYANAMSHA_OPTIONS_ETAG}
+    if request.headers.get('If-None-Match') == AYANAMSHA_OPTIONS_ETAG:
+        return Response(status_code=304, headers=cache_headers)
+    return Response(content=AYANAMSHA_OPTIONS_BODY, media_type="application/json", headers=cache_headers)
+
+# Minimum seconds between /security-status responses
+SECURITY_STATUS_INTERVAL = 5
+_security_status_last_served = 0.0
 
 @app.get("/security-status")
-async def security_status():
-    """Security status endpoint for monitoring"""
-    cleanup_expired_sessions()
+async def security_status(admin_user: str = Depends(verify_admin_session)):
+    """Security status endpoint for monitoring (admin only, throttled)"""
+    global _security_status_last_served
+    now = time.monotonic()
+    wait = SECURITY_STATUS_INTERVAL - (now - _security_status_last_served)
+    if wait > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Security status is rate limited. Try again later.",
+            headers={"Retry-After": str(int(wait) + 1)}
+        )
+    _security_status_last_served = now
+    
     return {
         "status": "secure",
         "environment_auth": bool(os.getenv('ADMIN_PASSWORD_HASH')),
@@ -3621,13 +4119,33 @@ async def security_status():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "ephe_path": ephe_path}
+    return Response(
+        content=HEALTH_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=5"}
+    )
 
 @app.api_route("/api", methods=["GET", "HEAD"])
 async def api_health_check():
     """API health check endpoint for monitoring systems (handles both GET and HEAD)"""
-    return {"status": "ok", "api": "vedic-astrology-calculator", "version": "1.0"}
+    return Response(content=API_STATUS_BODY, media_type="application/json")
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000)
\ No newline at end of file
+    
+    # One worker by default: admin sessions and API key state live in process memory
+    # and SQLite serialises writes, so extra workers are opt-in via WEB_CONCURRENCY
+    workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+    uvicorn.run(
+        # Multiple workers need an import string so each process can load the app
+        "main:app" if workers > 1 else app,
+        host=os.getenv('HOST', '0.0.0.0'),
+        port=int(os.getenv('PORT', '5000')),
+        workers=workers,
+        # uvloop is not available on Windows; uvicorn falls back to asyncio there
+        loop="uvloop" if sys.platform != 'win32' else "asyncio",
+        http="httptools",
+        # Access lines are INFO level, so the default also silences per-request logging
+        log_level=os.getenv('LOG_LEVEL', 'warning').lower()
+    )
\ No newline at end of file